@@ -1,79 +1,167 @@
 #!/bin/bash
 # Builds memory-index.json from MEMORY.md + memory/*.md for Mission Control
+# Incremental: a manifest of (path, mtime, size, hash) lets unchanged files
+# reuse their previous entry, so only changed files are read and parsed.
+# The index holds metadata only; file bodies go to memory-shards/<sha1>.md,
+# which never change once written and are fetched by the dashboard on demand.
+# An entry's "modified" is the mtime of its last content change: a touch or
+# a same-content rewrite updates only the manifest, so delta clients
+# (/api/memory/changes, by version) never miss a field a full fetch has.
 cd /Users/knut/.openclaw/workspace
 
 python3 << 'PYEOF'
-import json, os, glob, re
+import json, os, glob, re, hashlib, sys
 from datetime import datetime
 
-files = []
+sys.path.insert(0, "scripts")
+import memory_sections
+
+MAX_TOMBSTONES = 500  # removed-file records kept for delta sync
+INDEX_FILE = "memory-index.json"
+MANIFEST_FILE = ".memory-index-manifest.json"
+SHARD_DIR = "memory-shards"
+
+
+def load_json(path, default):
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except ValueError:
+            pass
+    return default
+
+
+def write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_shard(h, content):
+    """Write a content-addressed body; an existing shard is already correct."""
+    path = f"{SHARD_DIR}/{h}.md"
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    return path
+
+
+# (path, name, type, date or None = use mtime) in index order
+sources = []
 
 # MEMORY.md (long-term)
 if os.path.exists("MEMORY.md"):
-    with open("MEMORY.md") as f:
-        content = f.read()
-    files.append({
-        "path": "MEMORY.md",
-        "name": "Long-Term Memory",
-        "type": "longterm",
-        "date": datetime.fromtimestamp(os.path.getmtime("MEMORY.md")).strftime("%Y-%m-%d"),
-        "modified": datetime.fromtimestamp(os.path.getmtime("MEMORY.md")).isoformat(),
-        "size": len(content),
-        "content": content,
-        "sections": [s.strip() for s in re.findall(r'^## (.+)$', content, re.MULTILINE)]
-    })
+    sources.append(("MEMORY.md", "Long-Term Memory", "longterm", None))
 
 # Daily logs
 for path in sorted(glob.glob("memory/*.md"), reverse=True):
     fname = os.path.basename(path)
-    if not fname.endswith('.md'):
-        continue
-    with open(path) as f:
-        content = f.read()
-    
     # Extract date from filename
     date_match = re.match(r'(\d{4}-\d{2}-\d{2})', fname)
     date = date_match.group(1) if date_match else fname.replace('.md','')
-    
     # Friendly name
-    name = fname.replace('.md','')
-    
-    files.append({
-        "path": "memory/" + fname,
-        "name": name,
-        "type": "daily",
-        "date": date,
-        "modified": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
-        "size": len(content),
-        "content": content,
-        "sections": [s.strip() for s in re.findall(r'^## (.+)$', content, re.MULTILINE)]
-    })
+    sources.append(("memory/" + fname, fname.replace('.md',''), "daily", date))
 
 # Identity + Soul + User (reference docs)
 for ref in ["IDENTITY.md", "SOUL.md", "USER.md"]:
     if os.path.exists(ref):
-        with open(ref) as f:
-            content = f.read()
-        files.append({
-            "path": ref,
-            "name": ref.replace('.md',''),
-            "type": "reference",
-            "date": datetime.fromtimestamp(os.path.getmtime(ref)).strftime("%Y-%m-%d"),
-            "modified": datetime.fromtimestamp(os.path.getmtime(ref)).isoformat(),
-            "size": len(content),
-            "content": content,
-            "sections": [s.strip() for s in re.findall(r'^## (.+)$', content, re.MULTILINE)]
-        })
+        sources.append((ref, ref.replace('.md',''), "reference", None))
+
+os.makedirs(SHARD_DIR, exist_ok=True)
+prev = load_json(INDEX_FILE, {})
+prev_files = {f["path"]: f for f in prev.get("files", [])}
+manifest = load_json(MANIFEST_FILE, {})
+prev_version = prev.get("version", 0)
+version = prev_version + 1
+
+files = []
+new_manifest = {}
+changed = False
+parsed = 0
+
+for path, name, ftype, date in sources:
+    st = os.stat(path)
+    mtime = datetime.fromtimestamp(st.st_mtime)
+    seen = manifest.get(path)
+    old = prev_files.get(path)
+
+    if (seen and old and "version" in old and "shard" in old
+            and seen["mtime_ns"] == st.st_mtime_ns and seen["size"] == st.st_size
+            and os.path.exists(old["shard"])):
+        # Untouched since last build — reuse the entry without reading the file
+        files.append(dict(old, name=name, type=ftype, date=date or old["date"]))
+        new_manifest[path] = seen
+        continue
+
+    doc = memory_sections.load(path)
+    content = doc.text
+    parsed += 1
+    h = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    entry = {
+        "path": path,
+        "name": name,
+        "type": ftype,
+        "date": date or mtime.strftime("%Y-%m-%d"),
+        "modified": mtime.isoformat(),
+        "size": len(content),
+        "shard": write_shard(h, content),
+        "sections": [s.title for s in doc.headings(2)],
+        "hash": h,
+    }
+    # Versioning for /api/memory/changes — a file's version is the index
+    # version of the build that last changed its content.
+    if old and old.get("hash") == h and "version" in old and "shard" in old:
+        # Same content: keep the entry as clients have it
+        entry.update(version=old["version"], modified=old.get("modified", entry["modified"]),
+                     date=date or old.get("date", entry["date"]))
+    else:
+        entry["version"] = version
+        changed = True
+    files.append(entry)
+    new_manifest[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "hash": h}
+
+current_paths = {f["path"] for f in files}
+removed = [t for t in prev.get("removed", []) if t["path"] not in current_paths]
+for path in prev_files:
+    if path not in current_paths:
+        removed.append({"path": path, "version": version})
+        changed = True
+removed_floor = prev.get("removedFloor", 0)
+if len(removed) > MAX_TOMBSTONES:
+    dropped = removed[:-MAX_TOMBSTONES]
+    removed = removed[-MAX_TOMBSTONES:]
+    # Clients older than this can't trust the tombstone list and must resync
+    removed_floor = max([removed_floor] + [t["version"] for t in dropped])
+
+if not changed:
+    # Only mtimes moved (touch, rewrite with same content) — refresh the manifest
+    if parsed:
+        write_atomic(MANIFEST_FILE, new_manifest)
+    print(f"Index up to date ({len(files)} files, {parsed} re-checked)")
+    raise SystemExit(0)
 
 index = {
     "lastUpdated": datetime.now().isoformat(),
+    "version": version if changed else prev_version,
     "totalFiles": len(files),
     "totalSize": sum(f["size"] for f in files),
-    "files": files
+    "files": files,
+    "removed": removed,
+    "removedFloor": removed_floor,
 }
 
-with open("memory-index.json", "w") as f:
-    json.dump(index, f, indent=2, ensure_ascii=False)
+write_atomic(INDEX_FILE, index)
+write_atomic(MANIFEST_FILE, new_manifest)
+
+# Drop shards no longer referenced (clients holding one re-sync the index)
+live = {os.path.basename(f["shard"]) for f in files}
+for name in os.listdir(SHARD_DIR):
+    if name.endswith(".md") and name not in live:
+        os.remove(os.path.join(SHARD_DIR, name))
 
-print(f"Indexed {len(files)} files, {sum(f['size'] for f in files)} bytes")
+print(f"Indexed {len(files)} files, {index['totalSize']} bytes ({parsed} re-parsed)")
 PYEOF
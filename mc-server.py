@@ -1,15 +1,115 @@
 #!/usr/bin/env python3
-"""Mission Control server with basic auth."""
+"""Mission Control server with basic auth.
+
+Connections are served from a bounded thread pool with HTTP/1.1 keep-alive.
+Past MAX_CONNECTIONS open sockets new clients get a fast 503, and SIGTERM /
+SIGINT drain in-flight requests before exiting. Files carry mtime/size ETags
+so dashboard polls revalidate with a 304 instead of re-downloading. Text files
+are sent gzip/brotli-encoded from an on-disk cache (.mc-cache/) that is rebuilt
+lazily when the source changes; everything else goes out via sendfile().
+/api/events pushes Server-Sent Events when a watched JSON artifact is rewritten.
+/metrics exposes request counters and latency histograms in Prometheus text
+format; set MC_ACCESS_LOG to also write a rotating JSON-lines access log.
+/api/dashboard returns every dashboard file in one response, built from
+parsed JSON cached in-process and re-read only when a file changes, and
+/api/memory/changes?since=<version> returns only the memory files that changed.
+/api/memory/search?q=... runs BM25 keyword search over the FTS5 index kept by
+scripts/memory_search.py.
+"""
 import http.server
 import os
 import base64
+import bisect
+import email.utils
+import gzip
 import hashlib
+import json
+import logging
+import logging.handlers
 import secrets
+import signal
+import socket
+import sqlite3
+import stat
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import brotli
+except ImportError:  # optional — gzip only
+    brotli = None
 
 DIRECTORY = "/Users/knut/.openclaw/workspace"
+
+sys.path.insert(0, os.path.join(DIRECTORY, "scripts"))
+try:
+    import memory_search
+except ImportError:  # search endpoint answers 503
+    memory_search = None
+try:
+    import memory_access
+except ImportError:  # searches just aren't logged
+    memory_access = None
 PORT = 8891
 BIND = "0.0.0.0"
 
+MAX_CONNECTIONS = 64     # open sockets (one pool thread each) before shedding with 503
+KEEPALIVE_TIMEOUT = 15   # seconds an idle keep-alive connection may hold its slot
+DRAIN_TIMEOUT = 10       # seconds shutdown waits for in-flight responses before cutting them off
+
+# Precompressed copies of text files, mirrored by relative path
+COMPRESS_CACHE = os.path.join(DIRECTORY, ".mc-cache")
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+ENCODINGS = [  # (Content-Encoding, cache suffix, ETag suffix), most preferred first
+    ("br", ".br", "-br"),
+    ("gzip", ".gz", "-gz"),
+]
+
+# Files pushed to /api/events subscribers when rewritten
+WATCHED_FILES = [
+    "tasks.json", "schedule.json", "state.json", "investments.json",
+    "system-health.json", "activity.json", "memory-index.json",
+    "logs/cron/watchdog.json",
+]
+WATCH_INTERVAL = 0.5     # stat-poll period while at least one client is subscribed
+SSE_PING_INTERVAL = 15   # comment line that keeps proxies open and detects dead clients
+
+# /api/dashboard snapshot keys -> workspace files
+DASHBOARD_FILES = {
+    "tasks": "tasks.json",
+    "schedule": "schedule.json",
+    "investments": "investments.json",
+    "activity": "activity.json",
+    "systemHealth": "system-health.json",
+    "state": "state.json",
+    "memory": "memory-index.json",
+}
+DASHBOARD_BODY_CACHE = 32  # encoded responses kept per (fields, content) variant
+
+# /api/memory/search — FTS5 index, refreshed from disk at most this often
+SEARCH_DB = os.path.join(DIRECTORY, "memory-search.db")
+SEARCH_REFRESH = 5
+SEARCH_MAX_LIMIT = 50
+SECTION_ACCESS_LOG = os.path.join(DIRECTORY, "memory", "access-log.tsv")  # hits feed memory_access
+
+# Request metrics — histogram buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Static files with a /metrics label of their own; any other file is "(file)"
+METRIC_FILES = frozenset(
+    "/" + f for f in ["taskboard.html", *WATCHED_FILES, *DASHBOARD_FILES.values()]
+)
+ACCESS_LOG = os.environ.get("MC_ACCESS_LOG")  # e.g. logs/mc-access.jsonl; unset = off
+ACCESS_LOG_MAX_BYTES = 5_000_000
+ACCESS_LOG_BACKUPS = 3
+
+access_log = logging.getLogger("mc.access")
+access_log.propagate = False
+
 # Auth token stored in a file — generated on first run
 TOKEN_FILE = os.path.join(DIRECTORY, ".mc-token")
 
@@ -24,33 +124,380 @@ def get_or_create_token():
     return token
 
 TOKEN = get_or_create_token()
+AUTH_COOKIE = f"mc_auth={TOKEN}; Path=/; Max-Age=31536000; SameSite=Strict"
+
+# Files may be cached but must be revalidated; the login page and redirects never are
+REVALIDATE = "private, no-cache"
+IMMUTABLE = "private, max-age=31536000, immutable"
+IMMUTABLE_PREFIXES = ("/memory-shards/",)  # content-addressed: the name changes with the body
+NO_STORE = "no-cache, no-store, must-revalidate"
+
+BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Retry-After: 1\r\n"
+    b"Content-Length: 0\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+def file_version(st):
+    """Cheap content version from a stat result — also the body of the ETag."""
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def compressed_copy(path, st, coding, suffix):
+    """Return a cached compressed copy of path, rebuilding it if the source changed.
+
+    The copy's mtime is set to the source's, so staleness is one stat() away.
+    Rebuilds write to a temp file and rename, so concurrent requests never
+    see a partial copy.
+    """
+    rel = os.path.relpath(path, DIRECTORY)
+    if rel.startswith(".."):
+        return None
+    cache_path = os.path.join(COMPRESS_CACHE, rel + suffix)
+    try:
+        if os.stat(cache_path).st_mtime_ns == st.st_mtime_ns:
+            return cache_path
+    except OSError:
+        pass
+
+    try:
+        with open(path, "rb") as f:
+            fst = os.fstat(f.fileno())
+            if (fst.st_mtime_ns, fst.st_size) != (st.st_mtime_ns, st.st_size):
+                return None  # rewritten since the stat — serve identity this time
+            data = f.read()
+        if coding == "br":
+            data = brotli.compress(data, quality=9)
+        else:
+            data = gzip.compress(data, compresslevel=9, mtime=0)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, cache_path)
+    except OSError:
+        return None
+    return cache_path
+
+def prom_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """In-process request counters, rendered in Prometheus text format.
+
+    One lock and a bisect per request; histograms store per-bucket counts
+    and are made cumulative only when scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()   # (path, status)
+        self.bytes_sent = Counter() # path
+        self.auth = Counter()       # cookie / basic / token / none
+        self.latency = {}           # path -> [bucket counts..., +Inf count]
+        self.latency_sum = Counter()
+        self.in_flight = 0
+
+    def start(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, path, status, auth, nbytes, seconds):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(path, status)] += 1
+            self.bytes_sent[path] += nbytes
+            self.auth[auth] += 1
+            hist = self.latency.get(path)
+            if hist is None:
+                hist = self.latency[path] = [0] * (len(LATENCY_BUCKETS) + 1)
+            hist[bucket] += 1
+            self.latency_sum[path] += seconds
+
+    def rejected(self, path="(busy)", status=503):
+        """Count a connection turned away before any request was read."""
+        with self._lock:
+            self.requests[(path, status)] += 1
+
+    def render(self, open_connections):
+        with self._lock:
+            lines = [
+                "# HELP mc_requests_total Requests served, by path and status.",
+                "# TYPE mc_requests_total counter",
+            ]
+            for (path, status), n in sorted(self.requests.items()):
+                lines.append(f'mc_requests_total{{path="{prom_label(path)}",status="{status}"}} {n}')
+            lines += [
+                "# HELP mc_response_bytes_total Response body bytes sent, by path.",
+                "# TYPE mc_response_bytes_total counter",
+            ]
+            for path, n in sorted(self.bytes_sent.items()):
+                lines.append(f'mc_response_bytes_total{{path="{prom_label(path)}"}} {n}')
+            lines += [
+                "# HELP mc_auth_total Requests by how they authenticated.",
+                "# TYPE mc_auth_total counter",
+            ]
+            for kind, n in sorted(self.auth.items()):
+                lines.append(f'mc_auth_total{{method="{kind}"}} {n}')
+            lines += [
+                "# HELP mc_request_duration_seconds Time from request line to last byte written.",
+                "# TYPE mc_request_duration_seconds histogram",
+            ]
+            for path, hist in sorted(self.latency.items()):
+                sum_ = self.latency_sum[path]
+                path = prom_label(path)
+                total = 0
+                for le, n in zip(LATENCY_BUCKETS, hist):
+                    total += n
+                    lines.append(f'mc_request_duration_seconds_bucket{{path="{path}",le="{le}"}} {total}')
+                total += hist[-1]
+                lines.append(f'mc_request_duration_seconds_bucket{{path="{path}",le="+Inf"}} {total}')
+                lines.append(f'mc_request_duration_seconds_sum{{path="{path}"}} {sum_:.6f}')
+                lines.append(f'mc_request_duration_seconds_count{{path="{path}"}} {total}')
+            lines += [
+                "# HELP mc_requests_in_flight Requests currently being handled.",
+                "# TYPE mc_requests_in_flight gauge",
+                f"mc_requests_in_flight {self.in_flight}",
+                "# HELP mc_open_connections Open client connections (including idle keep-alive).",
+                "# TYPE mc_open_connections gauge",
+                f"mc_open_connections {open_connections}",
+            ]
+        return "\n".join(lines) + "\n"
+
+class SnapshotCache:
+    """Parsed JSON for dashboard files, re-read only when mtime/size change.
+
+    Encoded /api/dashboard bodies are cached too, keyed by the requested
+    variant and the versions of the files in it, so concurrent pollers of
+    an unchanged workspace share one json.dumps().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parsed = {}  # rel -> (version, data, data without memory content)
+        self._bodies = {}  # (fields, content, versions) -> (etag, body, gzipped body)
+
+    def load(self, rel):
+        """Return (version, data, lite data) for a workspace file; data is None if missing."""
+        path = os.path.join(DIRECTORY, rel)
+        try:
+            version = file_version(os.stat(path))
+        except OSError:
+            return None, None, None
+        entry = self._parsed.get(rel)
+        if entry and entry[0] == version:
+            return entry
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Mid-write or broken — keep serving the last good parse
+            return entry if entry else (version, None, None)
+        lite = data
+        if isinstance(data, dict) and isinstance(data.get("files"), list):
+            lite = dict(data, files=[{k: v for k, v in f.items() if k != "content"}
+                                     for f in data["files"] if isinstance(f, dict)])
+        entry = (version, data, lite)
+        with self._lock:
+            self._parsed[rel] = entry
+        return entry
+
+    def response(self, fields, content):
+        """Return (etag, body, gzipped body) for a snapshot of the given keys."""
+        loaded = {key: self.load(DASHBOARD_FILES[key]) for key in fields}
+        versions = {key: entry[0] for key, entry in loaded.items()}
+        cache_key = (fields, content, tuple(versions.values()))
+        with self._lock:
+            cached = self._bodies.get(cache_key)
+        if cached:
+            return cached
+
+        snapshot = {"generatedAt": time.time(), "versions": versions}
+        for key, (version, data, lite) in loaded.items():
+            snapshot[key] = data if content else lite
+        body = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode()
+        digest = hashlib.sha1(repr(cache_key).encode()).hexdigest()[:20]
+        entry = (f'"{digest}"', body, gzip.compress(body, compresslevel=6, mtime=0))
+        with self._lock:
+            if len(self._bodies) >= DASHBOARD_BODY_CACHE:
+                self._bodies.clear()
+            self._bodies[cache_key] = entry
+        return entry
+
+class SearchIndex:
+    """Per-thread SQLite connections to the memory FTS5 index.
+
+    The index is brought up to date (a stat per source file) on a
+    background thread, never on a request thread. A search that finds the
+    index more than SEARCH_REFRESH seconds old wakes that thread and runs
+    against the index as it is; only the first search after startup waits
+    for a refresh. Like FileWatcher, an idle server does no work.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._updated = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = memory_search.connect(SEARCH_DB)
+        return conn
+
+    def _run(self):
+        conn = memory_search.connect(SEARCH_DB)
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                memory_search.update(conn, memory_search.Path(DIRECTORY))
+            except Exception as e:
+                print(f"search index update failed: {e}", file=sys.stderr)
+            self._updated = time.monotonic()
+            self._ready.set()
+
+    def search(self, query, limit):
+        if time.monotonic() - self._updated > SEARCH_REFRESH:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mc-search", daemon=True)
+                    self._thread.start()
+            self._wake.set()
+            self._ready.wait(SEARCH_REFRESH)
+        return memory_search.search(self._connection(), query, limit=limit)
+
+class FileWatcher:
+    """Stat-polls a set of workspace files and wakes subscribers on change.
+
+    The polling thread only runs while someone is subscribed, so an idle
+    server does no work. Changes are kept in a short log keyed by a
+    sequence number; a subscriber that falls off the end gets a full
+    snapshot instead.
+    """
+
+    def __init__(self, paths, interval=WATCH_INTERVAL):
+        self.paths = paths
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._versions = {}
+        self._log = deque(maxlen=256)  # (seq, path, version)
+        self._seq = 0
+        self._subscribers = 0
+        self._thread = None
+        self._closed = False
+
+    def _scan(self):
+        versions = {}
+        for rel in self.paths:
+            try:
+                versions[rel] = file_version(os.stat(os.path.join(DIRECTORY, rel)))
+            except OSError:
+                versions[rel] = None
+        return versions
+
+    def subscribe(self):
+        """Register a subscriber; returns (seq, current versions)."""
+        with self._cond:
+            self._subscribers += 1
+            if self._thread is None:
+                # Baseline on (re)start so changes made while idle show up as one event
+                current = self._scan()
+                self._record(current)
+                self._thread = threading.Thread(target=self._run, name="mc-watch", daemon=True)
+                self._thread.start()
+            return self._seq, dict(self._versions)
+
+    def unsubscribe(self):
+        with self._cond:
+            self._subscribers -= 1
+
+    def wait(self, seq, timeout):
+        """Block until something changes after seq; returns (seq, {path: version}) or (seq, None)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq or self._closed, timeout)
+            if self._seq == seq:
+                return seq, None
+            if not self._log or self._log[0][0] > seq + 1:
+                return self._seq, dict(self._versions)
+            return self._seq, {path: version for s, path, version in self._log if s > seq}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _record(self, current):
+        # Caller holds self._cond
+        changed = False
+        for rel, version in current.items():
+            if self._versions.get(rel, "") != version:
+                self._seq += 1
+                self._log.append((self._seq, rel, version))
+                changed = True
+        self._versions = current
+        if changed:
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            with self._cond:
+                if self._closed or self._subscribers <= 0:
+                    self._thread = None
+                    return
+                self._record(current)
 
 class AuthHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive; every response must carry Content-Length
+    timeout = KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True  # headers and body are separate writes on a reused socket
+    set_auth_cookie = False
+    etag = None
+    status = None
+    bytes_sent = 0
+    auth_kind = "none"
+    metric_path = "(other)"
+    started = None
+    routes = {
+        "/api/events": "stream_events",
+        "/metrics": "send_metrics",
+        "/api/dashboard": "send_dashboard",
+        "/api/memory/changes": "send_memory_changes",
+        "/api/memory/search": "send_memory_search",
+    }
+    vary = False
+    cache_control = NO_STORE
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
-    def do_GET(self):
-        # Check for token in query string or cookie
-        from urllib.parse import urlparse, parse_qs
-        parsed = urlparse(self.path)
-        params = parse_qs(parsed.query)
+    def metric_label(self, path):
+        """Bounded /metrics label: routes and METRIC_FILES by path, the rest grouped.
 
-        # Check query param ?token=xxx
-        if "token" in params and params["token"][0] == TOKEN:
-            # Set cookie and redirect to clean URL
-            self.send_response(302)
-            self.send_header("Set-Cookie", f"mc_auth={TOKEN}; Path=/; Max-Age=31536000; SameSite=Strict")
-            clean_path = parsed.path or "/"
-            self.send_header("Location", clean_path)
-            self.end_headers()
-            return
+        Shard names change with every memory edit and other file paths are
+        up to the client, so neither may become a label value of its own.
+        """
+        if path in self.routes or path in METRIC_FILES or path == "/":
+            return path
+        for prefix in IMMUTABLE_PREFIXES:
+            if path.startswith(prefix):
+                return prefix + "*"
+        return "(file)"
 
+    def auth_method(self):
+        """Return how the request authenticated ("cookie" / "basic"), or None."""
         # Check cookie
         cookie_header = self.headers.get("Cookie", "")
         cookies = dict(c.strip().split("=", 1) for c in cookie_header.split(";") if "=" in c)
         if cookies.get("mc_auth") == TOKEN:
-            # Authorized — serve normally with no-cache headers
-            return super().do_GET()
+            return "cookie"
 
         # Check Basic Auth
         auth_header = self.headers.get("Authorization", "")
@@ -59,25 +506,418 @@ class AuthHandler(http.server.SimpleHTTPRequestHandler):
                 decoded = base64.b64decode(auth_header[6:]).decode()
                 user, pwd = decoded.split(":", 1)
                 if pwd == TOKEN:
-                    self.send_response(200)
-                    self.send_header("Set-Cookie", f"mc_auth={TOKEN}; Path=/; Max-Age=31536000; SameSite=Strict")
-                    self.end_headers()
-                    return super().do_GET()
+                    return "basic"
             except Exception:
                 pass
+        return None
+
+    def do_GET(self):
+        self.set_auth_cookie = False
+        self.etag = None
+        self.vary = False
+        self.cache_control = NO_STORE
+
+        # Check for token in query string
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        # Check query param ?token=xxx
+        if "token" in params and params["token"][0] == TOKEN:
+            # Set cookie and redirect to clean URL
+            self.send_response(302)
+            self.auth_kind = "token"
+            self.metric_path = "(token)"
+            self.send_header("Set-Cookie", AUTH_COOKIE)
+            clean_path = parsed.path or "/"
+            self.send_header("Location", clean_path)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        method = self.auth_method()
+        if method:
+            self.auth_kind = method
+            self.metric_path = self.metric_label(parsed.path)
+            # Basic Auth clients get the cookie alongside the file itself
+            self.set_auth_cookie = method == "basic"
+            self.cache_control = IMMUTABLE if parsed.path.startswith(IMMUTABLE_PREFIXES) else REVALIDATE
+            route = self.routes.get(parsed.path)
+            if route:
+                return getattr(self, route)(parsed)
+            return super().do_GET()
 
         # Not authorized — send login page
+        self.metric_path = "(login)"
+        body = LOGIN_PAGE.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_dashboard(self, parsed):
+        """Combined snapshot: ?fields=tasks,schedule selects keys, ?content=0 drops memory bodies."""
+        params = parse_qs(parsed.query)
+        fields = DASHBOARD_FILES.keys()
+        if "fields" in params:
+            wanted = set(params["fields"][0].split(","))
+            fields = [key for key in DASHBOARD_FILES if key in wanted]
+        content = params.get("content", ["1"])[0] not in ("0", "false", "no")
+        etag, body, gzipped = self.server.snapshots.response(tuple(fields), content)
+        accepted = self.accepted_encodings()
+        use_gzip = accepted.get("gzip", accepted.get("*", 0.0)) > 0
+        self.etag = etag[:-1] + '-gz"' if use_gzip else etag
+        self.vary = True
+
+        if self.not_modified(None):
+            self.send_response(304)
+            self.end_headers()
+            return
+        if use_gzip:
+            body = gzipped
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_memory_changes(self, parsed):
+        """Delta of memory-index.json since a client's version.
+
+        Files carry the index version that last changed them and removals
+        leave tombstones, so an in-sync client gets an empty delta. Clients
+        that are unknown, ahead, or older than the tombstone horizon get a
+        full reset.
+        """
+        params = parse_qs(parsed.query)
+        try:
+            since = int(params.get("since", ["0"])[0])
+        except ValueError:
+            self.send_error(400, "since must be an integer")
+            return
+        _, index, _ = self.server.snapshots.load("memory-index.json")
+        if not isinstance(index, dict):
+            self.send_error(404, "memory-index.json not available")
+            return
+
+        files = index.get("files", [])
+        current = index.get("version", 0)
+        reset = since <= 0 or since > current or since < index.get("removedFloor", 0)
+        if reset:
+            changed, removed = files, []
+        else:
+            changed = [f for f in files if f.get("version", 0) > since]
+            removed = [t["path"] for t in index.get("removed", []) if t.get("version", 0) > since]
+        delta = {"version": current, "reset": reset, "changed": changed, "removed": removed}
+        if reset or changed or removed:
+            delta["order"] = [f["path"] for f in files]
+            delta["totalSize"] = index.get("totalSize", 0)
+        self.send_json(delta)
+
+    def send_memory_search(self, parsed):
+        """BM25-ranked memory sections: ?q=words&limit=10."""
+        if memory_search is None:
+            self.send_error(503, "memory_search unavailable")
+            return
+        params = parse_qs(parsed.query)
+        query = params.get("q", [""])[0].strip()
+        try:
+            limit = max(1, min(SEARCH_MAX_LIMIT, int(params.get("limit", ["10"])[0])))
+        except ValueError:
+            self.send_error(400, "limit must be an integer")
+            return
+        start = time.perf_counter()
+        try:
+            hits = self.server.search.search(query, limit) if query else []
+        except sqlite3.Error as e:
+            # A query FTS5 rejects is the client's; a lock held past the
+            # timeout (a refresh mid-write) or a damaged index is ours
+            busy = "locked" in str(e) or "busy" in str(e)
+            bad_query = isinstance(e, sqlite3.OperationalError) and not busy
+            self.send_json({"query": query, "error": str(e)}, status=400 if bad_query else 503)
+            return
+        if hits and memory_access is not None:
+            memory_access.record([memory_access.section_key(h["path"], h["title"]) for h in hits],
+                                 "dashboard", SECTION_ACCESS_LOG)
+        self.send_json({
+            "query": query,
+            "elapsedMs": round((time.perf_counter() - start) * 1000, 2),
+            "hits": hits,
+        })
+
+    def send_json(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+        self.cache_control = NO_STORE
+        self.vary = True
+        accepted = self.accepted_encodings()
+        use_gzip = (len(body) >= COMPRESS_MIN_SIZE
+                    and accepted.get("gzip", accepted.get("*", 0.0)) > 0)
+        if use_gzip:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_metrics(self, parsed):
+        body = self.server.metrics.render(len(self.server._open)).encode()
+        self.cache_control = NO_STORE
         self.send_response(200)
-        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(LOGIN_PAGE.encode())
+        self.wfile.write(body)
+
+    def stream_events(self, parsed):
+        """Server-Sent Events: a snapshot of WATCHED_FILES versions, then one event per change."""
+        watcher = self.server.watcher
+        seq, versions = watcher.subscribe()
+        try:
+            self.cache_control = NO_STORE
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")  # no Content-Length — the stream ends with the socket
+            self.end_headers()
+            self.write_event("snapshot", seq, versions)
+            while not self.server.draining:
+                seq, changes = watcher.wait(seq, SSE_PING_INTERVAL)
+                if changes is None:
+                    self.wfile.write(b": ping\n\n")
+                    self.bytes_sent += 8
+                else:
+                    self.write_event("change", seq, changes)
+        except OSError:
+            pass  # client went away
+        finally:
+            watcher.unsubscribe()
+
+    def write_event(self, event, seq, files):
+        data = json.dumps({"files": files}, separators=(",", ":"))
+        chunk = f"event: {event}\nid: {seq}\ndata: {data}\n\n".encode()
+        self.wfile.write(chunk)
+        self.bytes_sent += len(chunk)
+
+    def send_head(self):
+        """Serve a file, answering 304 when the client's copy is still current.
+
+        The ETag is derived from mtime and size (plus the content coding), so
+        it costs one stat() and no reads. Compressible files are served from
+        the precompressed cache when the client accepts it.
+        """
+        path = self.translate_path(self.path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return super().send_head()
+        if not stat.S_ISREG(st.st_mode):
+            return super().send_head()
+
+        ctype = self.guess_type(path)
+        encoded = None
+        if st.st_size >= COMPRESS_MIN_SIZE and ctype.startswith(COMPRESSIBLE_TYPES):
+            self.vary = True
+            encoded = self.negotiate_encoding(path, st)
+        etag_suffix = encoded[2] if encoded else ""
+        self.etag = f'"{file_version(st)}{etag_suffix}"'
+
+        if self.not_modified(st):
+            self.send_response(304)
+            self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+            self.end_headers()
+            return None
+        if encoded is None:
+            return super().send_head()
+
+        coding, cache_path, _ = encoded
+        try:
+            f = open(cache_path, "rb")
+        except OSError:
+            return super().send_head()
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Encoding", coding)
+        self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+        self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+        self.end_headers()
+        return f
+
+    def not_modified(self, st):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since and st is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(st.st_mtime) <= since
+        return False
+
+    def accepted_encodings(self):
+        """Parse Accept-Encoding into {coding: q}."""
+        accepted = {}
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip().lower()] = q
+        return accepted
+
+    def negotiate_encoding(self, path, st):
+        """Return (coding, cache path, etag suffix) for the best accepted coding, or None."""
+        accepted = self.accepted_encodings()
+        for coding, suffix, etag_suffix in ENCODINGS:
+            if coding == "br" and brotli is None:
+                continue
+            if accepted.get(coding, accepted.get("*", 0.0)) <= 0:
+                continue
+            cache_path = compressed_copy(path, st, coding, suffix)
+            if cache_path:
+                return coding, cache_path, etag_suffix
+        return None
+
+    def copyfile(self, source, outputfile):
+        if hasattr(source, "fileno"):
+            # Kernel-side copy for real files; the socket timeout still applies
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
 
     def end_headers(self):
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
+        if self.set_auth_cookie:
+            self.send_header("Set-Cookie", AUTH_COOKIE)
+        if self.server.draining:
+            self.send_header("Connection", "close")
+        if self.etag:
+            self.send_header("ETag", self.etag)
+        if self.vary:
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", self.cache_control)
         super().end_headers()
 
+    def parse_request(self):
+        # Timed from here so idle keep-alive waits don't count as latency
+        self.started = time.perf_counter()
+        self.status = None
+        self.bytes_sent = 0
+        self.auth_kind = "none"
+        self.metric_path = "(other)"
+        self.server.metrics.start()
+        return super().parse_request()
+
+    def handle_one_request(self):
+        self.started = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self.started is not None:
+                self.record_request(time.perf_counter() - self.started)
+
+    def record_request(self, seconds):
+        status = self.status or 0
+        path = self.metric_path if status < 400 else "(other)"
+        self.server.metrics.finish(path, status, self.auth_kind, self.bytes_sent, seconds)
+        if access_log.handlers:
+            access_log.info(json.dumps({
+                "ts": time.time(),
+                "client": self.client_address[0],
+                "method": self.command,
+                "path": self.path.split("?", 1)[0],
+                "status": status,
+                "bytes": self.bytes_sent,
+                "auth": self.auth_kind,
+                "ms": round(seconds * 1000, 2),
+            }, separators=(",", ":")))
+
+    def send_response_only(self, code, message=None):
+        self.status = code
+        super().send_response_only(code, message)
+
+    def send_header(self, keyword, value):
+        if (keyword.lower() == "content-length" and self.command != "HEAD"
+                and self.status not in (204, 304)):
+            self.bytes_sent += int(value)
+        super().send_header(keyword, value)
+
     def log_message(self, format, *args):
-        pass  # Suppress logs
+        pass  # Suppress logs — see /metrics and MC_ACCESS_LOG
+
+class MissionControlServer(http.server.HTTPServer):
+    """HTTPServer that runs each connection on a bounded thread pool."""
+    request_queue_size = 128  # listen backlog; the default 5 drops SYNs when tabs reconnect together
+
+    def __init__(self, address, handler, max_connections=MAX_CONNECTIONS):
+        super().__init__(address, handler)
+        self.draining = False
+        self.watcher = FileWatcher(WATCHED_FILES)
+        self.snapshots = SnapshotCache()
+        self.search = SearchIndex()
+        self.metrics = Metrics()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="mc-conn")
+        self._open = set()
+        self._open_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        if self.draining or not self._slots.acquire(blocking=False):
+            # Over the cap — answer immediately instead of queueing behind slow clients
+            try:
+                request.sendall(BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.metrics.rejected()
+            self.shutdown_request(request)
+            return
+        with self._open_lock:
+            self._open.add(request)
+        self._pool.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._open_lock:
+                self._open.discard(request)
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self):
+        """Close keep-alive connections after their current response."""
+        self.draining = True
+        self.watcher.close()
+        with self._open_lock:
+            for sock in self._open:
+                try:
+                    # Idle readers see EOF now; in-flight responses can still be written
+                    sock.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+
+    def server_close(self):
+        super().server_close()
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while self._open and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self._open_lock:
+            for sock in self._open:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)  # stalled client — unblock its writer
+                except OSError:
+                    pass
+        self._pool.shutdown(wait=True)
 
 LOGIN_PAGE = """<!DOCTYPE html>
 <html><head>
@@ -120,5 +960,20 @@ if (document.cookie.includes('mc_auth=')) { /* already logged in */ }
 if __name__ == "__main__":
     print(f"Mission Control on http://{BIND}:{PORT}")
     print(f"Token: {TOKEN}")
-    server = http.server.HTTPServer((BIND, PORT), AuthHandler)
+    if ACCESS_LOG:
+        access_log.setLevel(logging.INFO)
+        access_log.addHandler(logging.handlers.RotatingFileHandler(
+            os.path.join(DIRECTORY, ACCESS_LOG),
+            maxBytes=ACCESS_LOG_MAX_BYTES, backupCount=ACCESS_LOG_BACKUPS))
+    server = MissionControlServer((BIND, PORT), AuthHandler)
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it can't run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
     server.serve_forever()
+    server.drain()
+    server.server_close()
+    print("Mission Control stopped")
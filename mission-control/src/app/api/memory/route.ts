@@ -6,8 +6,14 @@ const WORKSPACE = '/Users/knut/.openclaw/workspace';
 
 export async function GET() {
   try {
-    const data = await readFile(path.join(WORKSPACE, 'memory-index.json'), 'utf-8');
-    return NextResponse.json(JSON.parse(data));
+    const data = JSON.parse(await readFile(path.join(WORKSPACE, 'memory-index.json'), 'utf-8'));
+    // The index holds metadata only — inline bodies from their content-addressed shards
+    await Promise.all(data.files.map(async (f: { shard?: string; content?: string }) => {
+      if (f.content === undefined && f.shard) {
+        f.content = await readFile(path.join(WORKSPACE, f.shard), 'utf-8').catch(() => '');
+      }
+    }));
+    return NextResponse.json(data);
   } catch {
     return NextResponse.json({ files: [], totalSize: 0 }, { status: 500 });
   }
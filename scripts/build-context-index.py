@@ -2,55 +2,131 @@
 """
 Build context index for OpenClaw workspace memory files.
 Extracts topics, names, tickers, and project names from markdown files.
+
+The index is an inverted index with two parts:
+  topics    topic -> postings sorted by (path, startLine), deduplicated by
+            line interval, each with a term frequency and a weight
+  terms     word -> [[section id, tf, weight], ...] over the flat H1-H3
+            sections listed in "sections", for ranked multi-word lookups
+
+Each "sections" row is [path, startLine, endLine, title, summary, tokens],
+tokens being an estimate of the section's LLM token cost; memory_context
+packs sections into a token budget from it.
+
+Per-file extraction results are cached in .context-index-cache.json with
+the file's (mtime_ns, size) and content hash. A file whose stat matches is
+not read at all; one whose stat moved is parsed through memory_sections
+(whose tree memory-maintenance's other steps share) and re-processed only
+if its hash changed. The cached and fresh per-file postings are then
+merged into the index.
+
+Usage:
+  python3 build-context-index.py                       # rebuild memory/context-index.json
+  python3 build-context-index.py --no-cache            # re-process every file
+  python3 build-context-index.py --query "ollama routing" -k 5
+  python3 build-context-index.py --benchmark
 """
 
 import os
 import re
+import sys
 import json
 import glob
+import math
+import hashlib
+import time
+import argparse
 from datetime import datetime
 from collections import defaultdict, Counter
 
+import memory_access
+import memory_sections
+
+INDEX_PATH = "memory/context-index.json"
+INDEX_VERSION = 3
+CACHE_PATH = ".context-index-cache.json"
+CACHE_VERSION = 2    # bump when process_file's output changes
 
-def extract_headings(content, file_path, start_line=0):
-    """Extract H2/H3 headings with line numbers."""
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TITLE_BOOST = 3      # a word in a heading counts as this many body occurrences
+DEDUP_LINES = 5      # postings starting this close in one file are the same place
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def extract_headings(doc, file_path):
+    """Extract H2/H3 headings with line numbers.
+
+    Built on the memory_sections tree, which closes each section in the same
+    single pass that finds the next heading of the same or higher level, so
+    this is linear in file length.
+    """
     results = []
-    lines = content.split('\n')
-    
-    for i, line in enumerate(lines):
-        line_num = start_line + i + 1
-        # Match H2 (##) or H3 (###) headings
-        match = re.match(r'^(#{2,3})\s+(.+)', line.strip())
-        if match:
-            level = len(match.group(1))
-            heading = match.group(2).strip()
-            
-            # Find section end (next heading of same or higher level, or end of file)
-            end_line = len(lines) + start_line
-            for j in range(i + 1, len(lines)):
-                next_match = re.match(r'^(#{1,3})\s+', lines[j].strip())
-                if next_match and len(next_match.group(1)) <= level:
-                    end_line = start_line + j
-                    break
-            
-            # Get first ~50 chars of section content for summary
-            section_content = '\n'.join(lines[i+1:j if 'j' in locals() else len(lines)])
-            summary = re.sub(r'\s+', ' ', section_content.strip())[:50]
-            if len(summary) == 50:
-                summary += "..."
-            
-            if summary and len(summary.strip()) > 0:
-                results.append({
-                    "topic": heading.lower(),
-                    "path": file_path,
-                    "startLine": line_num,
-                    "endLine": end_line,
-                    "summary": summary
-                })
-    
+    lines = doc.lines
+
+    for section in doc.sections:
+        if section.level not in (2, 3):
+            continue
+
+        # First ~50 chars of the section (subsections included) for the summary
+        section_content = '\n'.join(lines[section.line:section.end_line])
+        summary = summarize(section_content)
+
+        if summary:
+            topic = section.title.lower()
+            results.append({
+                "topic": topic,
+                "path": file_path,
+                "startLine": section.line,
+                "endLine": section.end_line,
+                "summary": summary,
+                # the heading itself plus mentions in the section
+                "tf": 1 + section_content.lower().count(topic)
+            })
+
     return results
 
 
+def tokenize(text):
+    return [w.lower() for w in TOKEN_RE.findall(text)]
+
+
+def summarize(text):
+    summary = re.sub(r'\s+', ' ', text.strip())[:50]
+    if len(summary) == 50:
+        summary += "..."
+    return summary
+
+
+def extract_sections(doc, file_path):
+    """Flat H1-H3 sections with raw term counts, the documents of the term index.
+
+    Text before the first heading is its own section, titled after the file.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    sections = []
+    for chunk in doc.chunks(1, 3, preamble=True):
+        title = chunk.title or stem
+        body_words = tokenize(chunk.body)
+        title_words = tokenize(title)
+        if not body_words and not title_words:
+            continue
+        counts = Counter(body_words)
+        for word in title_words:
+            counts[word] += TITLE_BOOST
+        sections.append({
+            "path": file_path,
+            "startLine": chunk.line,
+            "endLine": chunk.end_line,
+            "title": title,
+            "summary": summarize(chunk.body),
+            "length": len(body_words) + len(title_words),
+            "tokens": memory_sections.estimate_tokens(chunk.text),
+            "counts": counts,
+        })
+    return sections
+
+
 def extract_names(content):
     """Extract capitalized names that appear multiple times."""
     # Find all capitalized words (2+ chars)
@@ -85,20 +161,24 @@ def extract_project_names(content):
 
 
 def process_file(file_path):
-    """Process a single markdown file and extract topics."""
+    """Process a single markdown file.
+
+    Returns {"entries": topic postings, "sections": term-index documents};
+    weights need corpus-wide statistics and are added by build_context_index.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        doc = memory_sections.load(file_path)
     except (UnicodeDecodeError, FileNotFoundError):
-        return []
+        return {"entries": [], "sections": []}
+    content = doc.text
     
     if not content.strip():
-        return []
+        return {"entries": [], "sections": []}
     
     results = []
     
     # Extract headings with line numbers
-    heading_results = extract_headings(content, file_path)
+    heading_results = extract_headings(doc, file_path)
     results.extend(heading_results)
     
     # Extract names, tickers, projects for the whole file
@@ -109,9 +189,8 @@ def process_file(file_path):
     # Add these as additional topics if not already covered by headings
     existing_topics = {r["topic"] for r in results}
     
-    summary = re.sub(r'\s+', ' ', content.strip())[:50]
-    if len(summary) == 50:
-        summary += "..."
+    summary = summarize(content)
+    lowered = content.lower()
     
     # Add names, tickers, projects as topics if not already present
     all_additional = set(names + tickers + projects)
@@ -121,21 +200,92 @@ def process_file(file_path):
                 "topic": topic,
                 "path": file_path,
                 "startLine": 1,
-                "endLine": len(content.split('\n')),
-                "summary": summary
+                "endLine": len(doc.lines),
+                "summary": summary,
+                "tf": max(1, lowered.count(topic))
             })
     
-    return results
+    return {"entries": results, "sections": extract_sections(doc, file_path)}
+
+
+def dedup_postings(postings):
+    """Sort by (path, startLine) and drop postings covered by the one before.
+
+    A posting is a duplicate of the last kept one in the same file if it
+    starts within DEDUP_LINES of it or lies inside its line interval. One
+    sweep over the sorted list, instead of comparing every pair.
+    """
+    postings.sort(key=lambda p: (p["path"], p["startLine"], -p["endLine"]))
+    kept = []
+    for posting in postings:
+        last = kept[-1] if kept else None
+        if (last and last["path"] == posting["path"] and
+                (posting["startLine"] - last["startLine"] < DEDUP_LINES or
+                 posting["endLine"] <= last["endLine"])):
+            last["tf"] = max(last["tf"], posting["tf"])
+            continue
+        kept.append(posting)
+    return kept
+
+
+def bm25_weight(tf, idf, length, avg_length):
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+    return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+
+def build_index(per_file):
+    """Merge per-file results (from process_file) into the inverted index."""
+    topics = defaultdict(list)
+    sections = []
+    for result in per_file:
+        for entry in result["entries"]:
+            topics[entry["topic"]].append({
+                "path": entry["path"],
+                "startLine": entry["startLine"],
+                "endLine": entry["endLine"],
+                "summary": entry["summary"],
+                "tf": entry["tf"]
+            })
+        sections.extend(result["sections"])
+
+    # Topics: a file mentioning the topic is one document for idf purposes
+    n_files = len({s["path"] for s in sections}) or 1
+    final_topics = {}
+    for topic in sorted(topics):
+        postings = dedup_postings(topics[topic])
+        idf = math.log(1 + n_files / len({p["path"] for p in postings}))
+        for posting in postings:
+            posting["weight"] = round(posting["tf"] * idf, 4)
+        final_topics[topic] = postings
 
+    # Terms: BM25 over the flat sections, which are sorted by (path, startLine)
+    # so every postings list comes out in that order too
+    sections.sort(key=lambda s: (s["path"], s["startLine"]))
+    n = len(sections) or 1
+    avg_length = sum(s["length"] for s in sections) / n or 1
+    df = Counter()
+    for section in sections:
+        df.update(section["counts"].keys())
+    terms = defaultdict(list)
+    for sid, section in enumerate(sections):
+        for term, tf in section["counts"].items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            weight = bm25_weight(tf, idf, section["length"], avg_length)
+            terms[term].append([sid, tf, round(weight, 4)])
 
-def build_context_index():
-    """Build the context index from memory files."""
-    index = {
-        "topics": defaultdict(list),
-        "updatedAt": datetime.now().isoformat() + "Z"
+    return {
+        "version": INDEX_VERSION,
+        "updatedAt": datetime.now().isoformat() + "Z",
+        "topics": final_topics,
+        "sections": [[s["path"], s["startLine"], s["endLine"], s["title"], s["summary"], s["tokens"]]
+                     for s in sections],
+        "terms": dict(sorted(terms.items())),
+        "stats": {"files": n_files, "sections": len(sections), "avgLength": round(avg_length, 1)}
     }
-    
-    # Files to scan
+
+
+def list_files():
+    """Memory files to index, in scan order, without duplicates or archive files."""
     scan_patterns = [
         "memory/*.md",
         "memory/people.md",
@@ -146,67 +296,198 @@ def build_context_index():
         "memory/patterns/*.md"
     ]
     
-    processed_files = set()
-    
+    processed_files = []
+    seen = set()
     for pattern in scan_patterns:
-        files = glob.glob(pattern)
-        for file_path in files:
+        for file_path in glob.glob(pattern):
             # Skip archive files and duplicates
-            if '/archive/' in file_path or file_path in processed_files:
+            if '/archive/' in file_path or file_path in seen:
                 continue
-                
-            processed_files.add(file_path)
-            results = process_file(file_path)
-            
-            for result in results:
-                topic = result["topic"]
-                entry = {
-                    "path": result["path"],
-                    "startLine": result["startLine"], 
-                    "endLine": result["endLine"],
-                    "summary": result["summary"]
-                }
-                index["topics"][topic].append(entry)
-    
-    # Convert defaultdict to regular dict and deduplicate
-    final_topics = {}
-    for topic, entries in index["topics"].items():
-        # Deduplicate entries with same path and similar line ranges
-        unique_entries = []
-        for entry in entries:
-            is_duplicate = False
-            for existing in unique_entries:
-                if (existing["path"] == entry["path"] and 
-                    abs(existing["startLine"] - entry["startLine"]) < 5):
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                unique_entries.append(entry)
-        
-        if unique_entries:  # Only include topics with entries
-            final_topics[topic] = unique_entries
-    
-    index["topics"] = final_topics
-    return index
-
-
-def main():
+            seen.add(file_path)
+            processed_files.append(file_path)
+    return processed_files
+
+
+def stat_key(file_path):
+    st = os.stat(file_path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def text_hash(doc):
+    return hashlib.sha1(doc.text.encode('utf-8')).hexdigest()
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def write_cache(files, path=CACHE_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f,
+                  ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def build_context_index(use_cache=True):
+    """Build the context index from memory files.
+
+    Files whose (mtime_ns, size) match the cache reuse their cached result
+    unread. The rest are loaded once through memory_sections; a file whose
+    content hash still matches only refreshes its stat, and the others are
+    processed from the same parsed tree.
+    """
+    cache = load_cache() if use_cache else {}
+    
+    start = time.time()
+    files = {}
+    per_file = []
+    changed = 0
+    for file_path in list_files():
+        try:
+            stat = stat_key(file_path)
+            cached = cache.get(file_path)
+            if cached and cached.get("stat") == stat:
+                files[file_path] = cached
+                per_file.append(cached["result"])
+                continue
+            h = text_hash(memory_sections.load(file_path))
+        except (OSError, UnicodeDecodeError):
+            continue
+        if cached and cached["hash"] == h:
+            result = cached["result"]
+        else:
+            result = process_file(file_path)  # memory_sections.load hits the tree above
+            changed += 1
+        files[file_path] = {"stat": stat, "hash": h, "result": result}
+        per_file.append(result)
+    elapsed = (time.time() - start) * 1000
+    if files != cache:
+        write_cache(files)
+    
+    print(f"Processed {changed} changed file(s) in {elapsed:.0f}ms, "
+          f"reused {len(files) - changed} from cache")
+    return build_index(per_file)
+
+
+def load_index(path=INDEX_PATH):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def query(index, text, k=5):
+    """Top-k sections for a multi-word query, best first (k=None: all matches).
+
+    Sums the precomputed per-posting weights of every query word, so the
+    cost is proportional to the postings touched, not the corpus. Each hit
+    carries the line range to read.
+    """
+    scores = defaultdict(float)
+    matched = defaultdict(int)
+    words = set(tokenize(text))
+    for word in words:
+        for sid, _tf, weight in index.get("terms", {}).get(word, ()):
+            scores[sid] += weight
+            matched[sid] += 1
+    # Sections containing more of the query words rank first, then by score
+    best = sorted(scores, key=lambda sid: (-matched[sid], -scores[sid]))[:k]
+    hits = []
+    for sid in best:
+        path, start, end, title, summary, tokens = index["sections"][sid]
+        hits.append({
+            "path": path,
+            "startLine": start,
+            "endLine": end,
+            "title": title,
+            "summary": summary,
+            "tokens": tokens,
+            "matched": matched[sid],
+            "score": round(scores[sid], 4)
+        })
+    return hits
+
+
+def synthetic_markdown(n_lines):
+    """Daily-log-shaped markdown: H2 topics with H3 subsections and bullets."""
+    out = ["# Synthetic log", ""]
+    i = 0
+    while len(out) < n_lines:
+        if i % 40 == 0:
+            out.append(f"## Topic {i}")
+        elif i % 8 == 0:
+            out.append(f"### Detail {i}")
+        else:
+            out.append(f"- note {i} about Ollama and SAMPO.HE with some filler text")
+        i += 1
+    return "\n".join(out[:n_lines])
+
+
+def benchmark(sizes=(6_250, 12_500, 25_000, 50_000), repeat=3):
+    """Time extract_headings on synthetic files; µs/line should stay flat."""
+    print(f"{'lines':>8} {'headings':>9} {'best ms':>9} {'us/line':>8}")
+    for n in sizes:
+        text = synthetic_markdown(n)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            doc = memory_sections.parse(text)
+            headings = extract_headings(doc, "synthetic.md")
+            best = min(best, time.perf_counter() - start)
+        print(f"{n:>8} {len(headings):>9} {best * 1000:>9.1f} {best / n * 1e6:>8.2f}")
+
+
+def main(argv=None):
     """Main function."""
+    parser = argparse.ArgumentParser(description="Build or query the memory context index")
+    parser.add_argument("--query", metavar="TEXT", help="Print the top sections for TEXT instead of rebuilding")
+    parser.add_argument("-k", type=int, default=5, help="Number of sections for --query")
+    parser.add_argument("--json", action="store_true", help="Print --query hits as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Re-process every file")
+    parser.add_argument("--benchmark", action="store_true", help="Time heading extraction on synthetic files")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    if args.query:
+        index = load_index()
+        if index.get("version") != INDEX_VERSION:
+            print(f"{INDEX_PATH} is from an older version; rebuild it first", file=sys.stderr)
+            return 1
+        hits = query(index, args.query, args.k)
+        memory_access.record([memory_access.section_key(h["path"], h["title"]) for h in hits],
+                             "context-index", os.path.join("memory", "access-log.tsv"))
+        if args.json:
+            print(json.dumps(hits, indent=2, ensure_ascii=False))
+            return
+        for h in hits:
+            print(f"[{h['score']:.2f}] {h['path']}:{h['startLine']}-{h['endLine']} — {h['title']}")
+        return
+
     print("Building context index...")
     
     # Build the index
-    index = build_context_index()
+    index = build_context_index(use_cache=not args.no_cache)
     
     # Ensure memory directory exists
     os.makedirs("memory", exist_ok=True)
     
-    # Write to file
-    output_path = "memory/context-index.json"
+    # Write to file. Compact: the terms section is thousands of short lists
+    output_path = INDEX_PATH
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
     
     print(f"Context index written to {output_path}")
-    print(f"Found {len(index['topics'])} topics")
+    print(f"Found {len(index['topics'])} topics, {len(index['terms'])} terms "
+          f"over {index['stats']['sections']} sections")
     
     # Show topic summary
     for topic in sorted(index['topics'].keys())[:20]:  # Show first 20 topics
@@ -218,4 +499,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
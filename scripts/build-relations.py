@@ -9,6 +9,8 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+import memory_entities
+
 def load_file_content(file_path):
     """Load and return file content, handling errors gracefully."""
     try:
@@ -94,49 +96,32 @@ def extract_infra(content):
     
     return infra
 
-def extract_stocks_from_context(content):
-    """Extract stock tickers from context-index.json topics."""
+def extract_stocks_from_context(content, workspace_path=None):
+    """Extract stocks mentioned in context-index.json topics.
+
+    Stock names and tickers come from memory_entities (projects.md picks and
+    the investments watchlist), so new holdings show up without code edits.
+    """
     stocks = {}
     
     try:
         data = json.loads(content)
         topics = data.get('topics', {})
         
-        # Look through topic keys for known stock mentions
-        # We'll be more conservative and only include explicit stock references
-        known_stock_names = ['sampo', 'novo', 'protector', 'bravida', 'coor', 'securitas', 'wwi']
-        
+        # Topic keys are lower-cased, so match without the case-sensitive check
+        entities = memory_entities.load(workspace_path or memory_entities.WORKSPACE)
         for topic_name in topics.keys():
-            topic_lower = topic_name.lower()
-            for stock_name in known_stock_names:
-                if stock_name in topic_lower:
-                    # Don't add duplicates
-                    if stock_name not in stocks:
-                        stocks[stock_name] = {
-                            "type": "stock",
-                            "display_name": stock_name.title(),
-                            "aliases": []
-                        }
-        
-        # Add some known stocks that might not be explicitly formatted
-        known_stocks = {
-            'sampo': {'ticker': 'SAMPO.HE'},
-            'novo': {'ticker': 'NOVO-B.CO'},
-            'protector': {'ticker': 'PROT.OL'},
-            'bravida': {'ticker': 'BRAV.ST'},
-            'coor': {'ticker': 'COOR.ST'},
-            'wwi': {'ticker': 'WWI.OL'},
-            'peg': {'ticker': 'PEG.CO'}
-        }
-        
-        for stock_name, info in known_stocks.items():
-            if any(stock_name in topic_name.lower() for topic_name in topics.keys()):
-                stock_key = stock_name
-                stocks[stock_key] = {
+            for match in entities.find(topic_name, kinds=("stock",), fold_case=True):
+                entity = match.entity
+                if entity.key in stocks:
+                    continue
+                stocks[entity.key] = {
                     "type": "stock",
-                    "ticker": info['ticker'],
+                    "display_name": entity.name,
                     "aliases": []
                 }
+                if entity.ticker:
+                    stocks[entity.key]["ticker"] = entity.ticker
     
     except json.JSONDecodeError as e:
         print(f"Warning: Could not parse context-index.json: {e}")
@@ -219,7 +204,7 @@ def main():
     entities.update(extract_people(people_content))
     entities.update(extract_projects(projects_content))
     entities.update(extract_infra(infra_content))
-    entities.update(extract_stocks_from_context(context_content))
+    entities.update(extract_stocks_from_context(context_content, workspace_path))
     
     print(f"Found {len(entities)} entities:")
     for entity_type in ['person', 'project', 'tool', 'stock']:
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Load test for mc-server — simulates dashboard tabs polling over keep-alive.
+
+Each poller holds one HTTP/1.1 connection and fetches the dashboard files in a
+loop, like taskboard.html's refresh(). Latency percentiles are reported per
+concurrency level so p99 can be compared between 1 and 50 pollers.
+
+Usage:
+  python3 mc-loadtest.py --token <token>                       # 1, 10, 50 pollers
+  python3 mc-loadtest.py --token <token> --levels 50 --seconds 30
+  python3 mc-loadtest.py --token <token> --slow-client memory-index.json
+"""
+
+import argparse, http.client, socket, sys, threading, time
+from urllib.parse import urlparse
+
+DEFAULT_URL = "http://127.0.0.1:8891"
+DEFAULT_PATHS = ["tasks.json", "schedule.json", "investments.json", "memory-index.json"]
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+def poller(host, port, token, paths, interval, deadline, latencies, errors, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Cookie": f"mc_auth={token}"}
+    while time.monotonic() < deadline:
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", "/" + path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                ok = resp.status < 400
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(path)
+        if interval:
+            time.sleep(interval)
+    conn.close()
+
+
+def slow_client(host, port, token, path, stop):
+    """Request a file and read it at ~1 KB/s to hold a connection open."""
+    while not stop.is_set():
+        try:
+            sock = socket.create_connection((host, port), timeout=30)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.sendall(f"GET /{path} HTTP/1.1\r\nHost: {host}\r\n"
+                         f"Cookie: mc_auth={token}\r\n\r\n".encode())
+            while not stop.is_set() and sock.recv(1024):
+                time.sleep(1)
+            sock.close()
+        except OSError:
+            time.sleep(1)
+
+
+def run_level(url, token, paths, n, seconds, interval):
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=poller, daemon=True,
+                                args=(host, port, token, paths, interval, deadline,
+                                      latencies, errors, lock))
+               for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return {
+        "pollers": n,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / seconds,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mc-server load test")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Pause between poll rounds in seconds (0 = hammer)")
+    parser.add_argument("--slow-client", metavar="PATH",
+                        help="Also keep one slow reader downloading PATH")
+    args = parser.parse_args()
+
+    parsed = urlparse(args.url)
+    stop = threading.Event()
+    if args.slow_client:
+        threading.Thread(target=slow_client, daemon=True,
+                         args=(parsed.hostname, parsed.port or 80, args.token,
+                               args.slow_client, stop)).start()
+        time.sleep(0.5)
+
+    print(f"{'pollers':>7} {'reqs':>7} {'err':>5} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'maxms':>8}")
+    results = []
+    for n in args.levels:
+        r = run_level(args.url, args.token, args.paths, n, args.seconds, args.interval)
+        results.append(r)
+        print(f"{r['pollers']:>7} {r['requests']:>7} {r['errors']:>5} {r['rps']:>8.0f} "
+              f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f}")
+    stop.set()
+
+    if any(r["errors"] for r in results):
+        print("\n⚠️ Some requests failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ from mem0 import Memory
 from pathlib import Path
 import time
 
+import memory_sections
+
 WORKSPACE = Path("/Users/knut/.openclaw/workspace")
 
 config = {
@@ -36,19 +38,13 @@ FILES = [
     "memory/patterns/cron-job-setup.md",
 ]
 
-def split_sections(text):
-    """Split markdown into sections by ## headers."""
-    sections = []
-    current = []
-    for line in text.split('\n'):
-        if line.startswith('## ') and current:
-            sections.append('\n'.join(current).strip())
-            current = [line]
-        else:
-            current.append(line)
-    if current:
-        sections.append('\n'.join(current).strip())
-    return [s for s in sections if len(s) > 20]  # skip tiny fragments
+def split_sections(doc, path):
+    """Split markdown into (title, text) sections by ## headers.
+
+    Text before the first ## is titled after the file, as in section keys.
+    """
+    return [(c.title or path.stem, c.text) for c in doc.chunks(2, 2, preamble=True)
+            if len(c.text) > 20]  # skip tiny fragments
 
 total = 0
 errors = 0
@@ -59,17 +55,16 @@ for fname in FILES:
         print(f"⚠️  SKIP: {fname} not found")
         continue
     
-    text = path.read_text(encoding='utf-8')
-    sections = split_sections(text)
+    sections = split_sections(memory_sections.load(path), path)
     print(f"\n📄 {fname} — {len(sections)} sections")
     
-    for i, section in enumerate(sections):
+    for i, (title, section) in enumerate(sections):
         # Truncate very long sections
         if len(section) > 2000:
             section = section[:2000] + "..."
         
         try:
-            result = m.add(section, user_id='knut', metadata={'source': fname, 'section': i})
+            result = m.add(section, user_id='knut', metadata={'source': fname, 'section': i, 'title': title})
             added = len(result.get('results', []))
             total += added
             print(f"  ✅ Section {i+1}/{len(sections)}: +{added} memories")
@@ -8,6 +8,8 @@ from mem0 import Memory
 from pathlib import Path
 from datetime import datetime
 
+import memory_access
+
 WORKSPACE = Path("/Users/knut/.openclaw/workspace")
 LOG_FILE = WORKSPACE / "memory" / "mem0-query-log.jsonl"
 
@@ -48,9 +50,23 @@ def query(text, limit=MAX_RESULTS, min_score=MIN_SCORE):
     LOG_FILE.parent.mkdir(exist_ok=True)
     with open(LOG_FILE, 'a') as f:
         f.write(json.dumps(log_entry) + '\n')
+    memory_access.record(hit_keys(hits), "mem0")
     
     return hits, elapsed
 
+def hit_keys(hits):
+    """Section keys for hits, from the (source, title) mem0-ingest stored.
+
+    Memories ingested before titles were stored are not recorded: their
+    section index may point at another heading once the file was edited.
+    """
+    keys = []
+    for h in hits:
+        meta = h.get('metadata') or {}
+        if meta.get('source') and meta.get('title'):
+            keys.append(memory_access.section_key(meta['source'], meta['title']))
+    return keys
+
 if __name__ == '__main__':
     if len(sys.argv) < 2:
         print("Usage: mem0-query.py <query> [limit]")
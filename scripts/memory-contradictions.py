@@ -6,16 +6,41 @@ Checks for:
 2. Duplicate entities with conflicting info
 3. Stale references (files/paths that no longer exist)
 4. Conflicting key-value facts (email, phone, etc.)
+
+Facts are extracted once per file and kept in a small store
+(.contradictions-facts.json), keyed by content hash: person → email,
+port → line context, referenced paths and H2 titles. A file whose
+(mtime, size) is unchanged is not even read. Only the facts a changed or
+removed file contributed — or now contributes — are re-evaluated; every
+other verdict comes from the store, so a run after a single memory write
+takes milliseconds.
+
+Whether a referenced path exists is cached in the store too, for
+PATH_TTL seconds. Expired paths are resolved in one batch grouped by
+parent directory: each directory is listed once (optionally on several
+threads, for slow network mounts) and a path is found by name in its
+listing. Only names missing from a listing are confirmed with
+os.path.exists, so case-insensitive volumes report the same as before.
+
+Usage:
+  python3 memory-contradictions.py            # incremental, exit 1 on alerts
+  python3 memory-contradictions.py --full     # ignore the store, re-check everything
+  python3 memory-contradictions.py --jobs 8   # list directories on 8 threads
 """
 
-import json, os, re, sys
+import argparse, functools, hashlib, json, os, re, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
+
+import memory_entities
+import memory_sections
 
 WORKSPACE = Path("/Users/knut/.openclaw/workspace")
 MEMORY_DIR = WORKSPACE / "memory"
-
-alerts = []
+STORE_PATH = WORKSPACE / ".contradictions-facts.json"
+STORE_VERSION = 1  # bump when extract_facts or an evaluator changes
+PATH_TTL = 6 * 3600  # seconds a path existence result is trusted
 
 # Patterns to extract facts
 EMAIL_RE = re.compile(r'[\w.-]+@[\w.-]+\.\w+')
@@ -23,134 +48,326 @@ DATE_RE = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')
 PATH_RE = re.compile(r'(/Users/[^\s\)\"\'`]+)')
 PORT_RE = re.compile(r'port\s+(\d{4,5})', re.I)
 TICKER_RE = re.compile(r'\b([A-Z]{2,5}(?:\.[A-Z]{2})?)(?:\s|$|\))')
+DAILY_RE = re.compile(r'memory/\d{4}-\d{2}-\d{2}\.md')
+
+# Ignore common/structural headings
+IGNORED_SECTIONS = {"", "context", "notes", "when", "steps", "gotchas", "constraints",
+                    "key concepts", "what we should build", "practical ideas",
+                    "quality rating", "implementation plan for openclaw",
+                    "practical implementation ideas", "what we should implement",
+                    "google chat", "calendar", "communication", "mission control",
+                    "bottenanna.no"}
+
+# Fact kinds, in report order
+CHECKS = ("email", "path", "port", "section")
 
 
-def scan_files():
-    """Read all memory markdown files."""
-    files = {}
+def list_files():
+    """(relative name, path) of every checked file, in scan order."""
+    files = []
     for f in MEMORY_DIR.glob("**/*.md"):
         if "archive" in str(f):
             continue
-        files[str(f.relative_to(WORKSPACE))] = f.read_text(encoding="utf-8")
+        files.append((str(f.relative_to(WORKSPACE)), f))
     # Also scan critical workspace files
     for name in ["MEMORY.md", "TOOLS.md", "USER.md", "IDENTITY.md"]:
         p = WORKSPACE / name
         if p.exists():
-            files[name] = p.read_text(encoding="utf-8")
+            files.append((name, p))
     return files
 
 
-def check_email_conflicts(files):
-    """Find same person with different emails."""
-    person_emails = defaultdict(set)
-    person_pattern = re.compile(r'(?:^|\n).*?(Knut|Melissa|Martin|Andre|Dag)\b.*?([\w.-]+@[\w.-]+\.\w+)', re.I)
-    
-    for fname, content in files.items():
-        for m in person_pattern.finditer(content):
-            person = m.group(1).lower()
-            email = m.group(2).lower()
-            person_emails[person].add((email, fname))
-    
-    for person, emails in person_emails.items():
-        unique = set(e[0] for e in emails)
-        if len(unique) > 3:  # Allow 3 (primary + alias + work), flag 4+
-            sources = [f"{e} ({f})" for e, f in emails]
-            alerts.append(f"⚠️ EMAIL CONFLICT: {person} has {len(unique)} emails: {', '.join(sources)}")
-
-
-def check_stale_paths(files):
-    """Find referenced file paths that don't exist."""
-    seen_paths = set()
-    for fname, content in files.items():
-        for m in PATH_RE.finditer(content):
-            path = m.group(1).rstrip(".,;:)")
-            if path not in seen_paths:
-                seen_paths.add(path)
-                if not os.path.exists(path) and not path.endswith("*"):
-                    # Skip obvious patterns, dynamic paths, bash $PATH, and daily log refs
-                    is_daily = re.match(r'memory/\d{4}-\d{2}-\d{2}\.md', fname)
-                    if ("/node_modules/" not in path and "<" not in path
-                            and ":$" not in path and "$" not in path
-                            and not is_daily):
-                        alerts.append(f"🔗 STALE PATH: {path} (referenced in {fname})")
-
-
-def check_port_conflicts(files):
-    """Find same port assigned to different services."""
-    port_services = defaultdict(list)
-    
-    for fname, content in files.items():
-        for line in content.split("\n"):
-            m = PORT_RE.search(line)
-            if m:
-                port = m.group(1)
-                # Get context (truncated line)
-                ctx = line.strip()[:80]
-                port_services[port].append((ctx, fname))
-    
-    for port, refs in port_services.items():
-        # Check if multiple DIFFERENT services use the same port
-        unique_files = set(r[1] for r in refs)
-        if len(refs) > 2 and len(unique_files) > 2:
-            contexts = set(r[0] for r in refs)
-            if len(contexts) > 1:
-                alerts.append(f"⚠️ PORT CONFLICT: port {port} referenced in {len(refs)} places")
-
-
-def check_duplicate_sections(files):
-    """Find near-duplicate section headers across files."""
-    sections = defaultdict(list)
-    
-    for fname, content in files.items():
-        for line in content.split("\n"):
-            if line.startswith("## "):
-                title = line[3:].strip().lower()
-                sections[title].append(fname)
-    
-    # Ignore common/structural headings
-    ignore = {"", "context", "notes", "when", "steps", "gotchas", "constraints",
-              "key concepts", "what we should build", "practical ideas",
-              "quality rating", "implementation plan for openclaw",
-              "practical implementation ideas", "what we should implement",
-              "google chat", "calendar", "communication", "mission control",
-              "bottenanna.no"}
-    
-    for title, fnames in sections.items():
-        unique_files = set(fnames)
-        if len(unique_files) > 1 and title not in ignore:
-            # Skip if all from patterns/, research files, or daily logs
-            if all("patterns/" in f or "research-" in f for f in unique_files):
-                continue
-            if all(re.match(r'memory/\d{4}-\d{2}-\d{2}\.md', f) for f in unique_files):
-                continue
-            alerts.append(f"📋 DUPLICATE SECTION: '{title}' appears in {', '.join(unique_files)}")
-
-
-def main():
-    files = scan_files()
-    
-    check_email_conflicts(files)
-    check_stale_paths(files)
-    check_port_conflicts(files)
-    check_duplicate_sections(files)
-    
+def extract_facts(doc, entities):
+    """{kind: [[key, value], ...]} for one parsed file."""
+    facts = {kind: [] for kind in CHECKS}
+    for line in doc.lines:
+        # First person on a line paired with the first email after it
+        if "@" in line:
+            people = entities.find(line, kinds=("person",))
+            if people:
+                m = EMAIL_RE.search(line, people[0].end)
+                if m:
+                    facts["email"].append([people[0].entity.key, m.group().lower()])
+        m = PORT_RE.search(line)
+        if m:
+            facts["port"].append([m.group(1), line.strip()[:80]])
+    seen = set()
+    for m in PATH_RE.finditer(doc.text):
+        path = m.group(1).rstrip(".,;:)")
+        if path not in seen:
+            seen.add(path)
+            facts["path"].append([path, ""])
+    facts["section"] = [[s.title.lower(), ""] for s in doc.headings(2)]
+    return facts
+
+
+def check_email(person, refs):
+    """Same person with different emails."""
+    emails = sorted(set((email, fname) for fname, email in refs))
+    unique = set(e for e, _ in emails)
+    if len(unique) > 3:  # Allow 3 (primary + alias + work), flag 4+
+        sources = [f"{e} ({f})" for e, f in emails]
+        return f"⚠️ EMAIL CONFLICT: {person} has {len(unique)} emails: {', '.join(sources)}"
+
+
+def checkable_path(path):
+    """Skip obvious patterns, dynamic paths and bash $PATH."""
+    return not (path.endswith("*") or "/node_modules/" in path
+                or "<" in path or "$" in path)
+
+
+def check_path(path, refs, exists=os.path.exists):
+    """Referenced file path that doesn't exist (reported for its first referrer)."""
+    fname = refs[0][0]
+    # Daily logs quote paths as they were at the time
+    if not checkable_path(path) or DAILY_RE.match(fname) or exists(path):
+        return None
+    return f"🔗 STALE PATH: {path} (referenced in {fname})"
+
+
+def check_port(port, refs):
+    """Same port assigned to different services."""
+    unique_files = set(fname for fname, _ in refs)
+    if len(refs) > 2 and len(unique_files) > 2:
+        contexts = set(ctx for _, ctx in refs)
+        if len(contexts) > 1:
+            return f"⚠️ PORT CONFLICT: port {port} referenced in {len(refs)} places"
+
+
+def check_section(title, refs):
+    """Near-duplicate section header across files."""
+    unique_files = list(dict.fromkeys(fname for fname, _ in refs))
+    if len(unique_files) < 2 or title in IGNORED_SECTIONS:
+        return None
+    # Skip if all from patterns/, research files, or daily logs
+    if all("patterns/" in f or "research-" in f for f in unique_files):
+        return None
+    if all(DAILY_RE.match(f) for f in unique_files):
+        return None
+    return f"📋 DUPLICATE SECTION: '{title}' appears in {', '.join(unique_files)}"
+
+
+EVALUATORS = {"email": check_email, "path": check_path,
+              "port": check_port, "section": check_section}
+
+
+class PathCache:
+    """Existence of paths, each result trusted for ttl seconds.
+
+    entries is {path: [exists, checked at]} and is updated in place, so it
+    can live in the fact store.
+    """
+
+    def __init__(self, entries, ttl=PATH_TTL, jobs=1):
+        self.entries = entries
+        self.ttl = ttl
+        self.jobs = jobs
+        self._listings = {}  # directory -> {name: is_dir, or None for symlinks}, None if missing
+
+    def exists(self, path):
+        entry = self.entries.get(path)
+        return entry[0] if entry else os.path.exists(path)
+
+    def resolve(self, paths, force=(), now=None):
+        """Re-check paths that are unknown, expired or in force.
+
+        Returns (number checked, set of paths whose result is new or flipped).
+        """
+        now = int(now or time.time())
+        due = [p for p in paths
+               if p in force or p not in self.entries or now - self.entries[p][1] >= self.ttl]
+        by_dir = {}
+        for path in due:
+            directory, name = os.path.split(path.rstrip("/") or "/")
+            by_dir.setdefault(directory, []).append((path, name))
+        self._list(d for d in by_dir if d not in self._listings)
+
+        flipped = set()
+        for directory, items in by_dir.items():
+            listing = self._listings[directory]
+            for path, name in items:
+                found = listing.get(name, False) if listing is not None else False
+                if listing is None:
+                    exists = False  # no directory, no children: one stat for all of them
+                elif found is None:  # symlink: let the OS follow it
+                    exists = os.path.exists(path)
+                elif found is False or (path.endswith("/") and not found):
+                    exists = os.path.exists(path)  # case-insensitive volumes, odd names
+                else:
+                    exists = True
+                old = self.entries.get(path)
+                if old is None or old[0] != exists:
+                    flipped.add(path)
+                self.entries[path] = [exists, now]
+        return len(due), flipped
+
+    def _list(self, directories):
+        directories = list(directories)
+        if self.jobs > 1 and len(directories) > 1:
+            with ThreadPoolExecutor(self.jobs) as pool:
+                listings = list(pool.map(_listdir, directories))
+        else:
+            listings = [_listdir(d) for d in directories]
+        self._listings.update(zip(directories, listings))
+
+    def prune(self, keep):
+        for path in set(self.entries) - set(keep):
+            del self.entries[path]
+
+
+def _listdir(directory):
+    try:
+        with os.scandir(directory) as it:
+            return {e.name: None if e.is_symlink() else e.is_dir() for e in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError:
+        return {}  # exists but can't be listed: every child falls back to os.path.exists
+
+
+def entity_signature(entities):
+    """Changes when the people list does, which invalidates every email fact."""
+    people = sorted(k for k, e in entities.entities.items() if e.kind == "person")
+    return hashlib.sha1("\n".join(people).encode("utf-8")).hexdigest()
+
+
+def load_store(path=STORE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if store.get("version") != STORE_VERSION:
+        return None
+    return store
+
+
+def write_store(store, path=STORE_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def update_facts(store, files, entities):
+    """Refresh the store's per-file facts; returns {kind: set of touched keys}.
+
+    A file is read only when its (mtime, size) moved, and its facts are
+    re-extracted only when its content hash did.
+    """
+    touched = {kind: set() for kind in CHECKS}
+    old_files = store["files"]
+    new_files = {}
+    for fname, path in files:
+        st = path.stat()
+        entry = old_files.get(fname)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            new_files[fname] = entry
+            continue
+        doc = memory_sections.load(path)
+        digest = hashlib.sha1(doc.text.encode("utf-8")).hexdigest()
+        if entry and entry["hash"] == digest:
+            new_files[fname] = {**entry, "mtime": st.st_mtime_ns, "size": st.st_size}
+            continue
+        facts = extract_facts(doc, entities)
+        new_files[fname] = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                            "hash": digest, "facts": facts}
+        for old_or_new in (entry["facts"] if entry else {}, facts):
+            for kind, pairs in old_or_new.items():
+                touched[kind].update(key for key, _ in pairs)
+    for fname, entry in old_files.items():
+        if fname not in new_files:  # deleted or renamed
+            for kind, pairs in entry["facts"].items():
+                touched[kind].update(key for key, _ in pairs)
+    store["files"] = new_files
+    return touched
+
+
+def run(full=False, store_path=STORE_PATH, jobs=1, path_ttl=PATH_TTL):
+    """Check every memory file, re-evaluating only facts touched since the last run.
+
+    A path fact also counts as touched when its cached existence result
+    expired and the path has since appeared or disappeared. Returns
+    (alerts, stats). The store is rewritten only when something changed.
+    """
+    entities = memory_entities.load(WORKSPACE)
+    signature = entity_signature(entities)
+    store = None if full else load_store(store_path)
+    if store is None or store.get("entities") != signature:
+        store = {"version": STORE_VERSION, "entities": signature, "files": {},
+                 "verdicts": {kind: {} for kind in CHECKS}}
+    fresh = not store["files"]
+
+    files = list_files()
+    before = {fname: entry["hash"] for fname, entry in store["files"].items()}
+    touched = update_facts(store, files, entities)
+    changed = sum(1 for fname, entry in store["files"].items()
+                  if before.get(fname) != entry["hash"]) + len(set(before) - set(store["files"]))
+
+    # key -> [(file, value)] in scan order, for every kind
+    refs = {kind: {} for kind in CHECKS}
+    for fname, _ in files:
+        for kind, pairs in store["files"][fname]["facts"].items():
+            for key, value in pairs:
+                refs[kind].setdefault(key, []).append((fname, value))
+
+    paths = PathCache(store.setdefault("paths", {}), path_ttl, jobs)
+    wanted = [p for p in refs["path"] if checkable_path(p)]
+    paths.prune(wanted)
+    checked, flipped = paths.resolve(wanted, force=touched["path"])
+    touched["path"] |= flipped
+    evaluators = {**EVALUATORS, "path": functools.partial(check_path, exists=paths.exists)}
+
+    evaluated = 0
+    for kind in CHECKS:
+        verdicts = store["verdicts"][kind]
+        for key in (refs[kind] if fresh else touched[kind]):
+            verdicts.pop(key, None)
+            if key in refs[kind]:
+                evaluated += 1
+                alert = evaluators[kind](key, refs[kind][key])
+                if alert:
+                    verdicts[key] = alert
+
+    alerts = [store["verdicts"][kind][key] for kind in CHECKS
+              for key in refs[kind] if key in store["verdicts"][kind]]
+    if changed or fresh or checked:
+        write_store(store, store_path)
+    return alerts, {"filesScanned": len(files), "filesChanged": changed,
+                    "pathsChecked": checked, "factsEvaluated": evaluated}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find conflicting facts across memory files")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the fact store and re-check every file")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Threads for listing referenced directories")
+    parser.add_argument("--path-ttl", type=int, default=PATH_TTL,
+                        help="Seconds a path existence result is trusted")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    alerts, stats = run(full=args.full, jobs=args.jobs, path_ttl=args.path_ttl)
+    elapsed = (time.perf_counter() - start) * 1000
+
     result = {
-        "timestamp": __import__("datetime").datetime.now().isoformat(),
-        "filesScanned": len(files),
+        "timestamp": datetime.now().isoformat(),
+        **stats,
+        "elapsedMs": round(elapsed, 1),
         "alertCount": len(alerts),
         "alerts": alerts,
         "status": "CLEAN" if not alerts else "CONFLICTS"
     }
-    
-    print(json.dumps(result, indent=2))
-    
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
     if alerts:
         print(f"\n⚠️ {len(alerts)} potential conflict(s) found", file=sys.stderr)
-        sys.exit(1)
-    else:
-        print("\n✅ No contradictions detected", file=sys.stderr)
-        sys.exit(0)
+        return 1
+    print("\n✅ No contradictions detected", file=sys.stderr)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
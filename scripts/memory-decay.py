@@ -13,11 +13,17 @@ from datetime import datetime
 from pathlib import Path
 import urllib.request, urllib.error
 
+import memory_context
+import memory_scores
+import memory_sections
+
 MEMORY_DIR = Path("/Users/knut/.openclaw/workspace/memory")
 ARCHIVE_DIR = MEMORY_DIR / "archive"
 WEEKLY_DIR = MEMORY_DIR / "weekly"
 OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
 MODEL = "qwen3-fast"
+# Source text per prompt; qwen3-fast runs with a 32K context and 1K output
+PROMPT_TOKEN_BUDGET = 12000
 
 
 def ollama_summarize(prompt: str) -> str:
@@ -45,11 +51,24 @@ def read_files(filenames: list[str]) -> dict[str, str]:
 
 
 def load_importance_scores() -> dict:
-    """Load importance scores to prioritize what survives decay."""
-    scores_file = MEMORY_DIR / "importance-scores.json"
-    if scores_file.exists():
-        return json.loads(scores_file.read_text()).get("scores", {})
-    return {}
+    """Load today's effective importance scores to prioritize what survives decay."""
+    return memory_scores.load(MEMORY_DIR / "importance-scores.json")
+
+
+def bounded_source(contents: dict[str, str]) -> str:
+    """Files as one prompt block, packed down to PROMPT_TOKEN_BUDGET if too long."""
+    combined = "\n\n---\n\n".join(
+        f"## {fn}\n{text}" for fn, text in sorted(contents.items())
+    )
+    if memory_sections.estimate_tokens(combined) <= PROMPT_TOKEN_BUDGET:
+        return combined
+    # Keep the most important (then most recent) sections that fit
+    candidates = memory_context.candidates_from_files(MEMORY_DIR / fn for fn in sorted(contents))
+    packed = memory_context.pack(candidates, PROMPT_TOKEN_BUDGET,
+                                 scores=load_importance_scores())
+    print(f"  ✂️  Source is ~{memory_sections.estimate_tokens(combined)} tokens; "
+          f"packed {len(packed['sections'])}/{len(candidates)} sections (~{packed['tokens']})")
+    return memory_context.render(packed)
 
 
 def consolidate_week(week: str, filenames: list[str], dry_run: bool = False):
@@ -72,9 +91,7 @@ def consolidate_week(week: str, filenames: list[str], dry_run: bool = False):
             if key.startswith(fn) and data.get("score", 0) >= 7:
                 high_importance.append(f"[IMPORTANT] {key}: {data.get('reason', '')}")
 
-    combined = "\n\n---\n\n".join(
-        f"## {fn}\n{text}" for fn, text in sorted(contents.items())
-    )
+    combined = bounded_source(contents)
 
     if dry_run:
         print(f"  🔍 Would consolidate {len(contents)} files → {outfile.name}")
@@ -120,6 +137,8 @@ def archive_old(filename: str, dry_run: bool = False):
         return
 
     content = path.read_text(encoding="utf-8")
+    if memory_sections.estimate_tokens(content) > PROMPT_TOKEN_BUDGET:
+        content = bounded_source({filename: content})
 
     prompt = f"""/no_think
 Extract only the most significant highlights from this daily log.
@@ -4,17 +4,32 @@
 Checks:
 1. File size anomalies (sudden growth/shrink > 50%)
 2. Missing expected files
-3. Duplicate content across files
+3. Duplicate content across files (near-duplicate sections, via memory_dedup)
 4. Empty sections
-5. Total memory size tracking
+5. Total memory size tracking, with growth and projected-limit alerts
+   from the size history (memory_history, memory/size-history.json)
+6. Duplicated bytes across memory/, archive and weekly, from content-defined
+   chunks (memory_chunks) — reported, not alerted; memory-index.json is left
+   out since it mirrors the files it lists
 
 Stores state in memory/integrity-state.json for comparison across runs.
+
+A file whose (size, mtime_ns, inode) matches the stored state is not
+read at all. Changed files are hashed with BLAKE2b in fixed-size chunks,
+several files at a time, so a run costs I/O in proportion to what
+changed rather than to the size of the corpus. The near-duplicate scan
+is likewise reused from the state when no file changed.
 """
 
-import hashlib, json, os, sys
+import hashlib, json, os, re, sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import memory_chunks
+import memory_dedup
+import memory_history
+
 MEMORY_DIR = Path("/Users/knut/.openclaw/workspace/memory")
 WORKSPACE = Path("/Users/knut/.openclaw/workspace")
 STATE_FILE = MEMORY_DIR / "integrity-state.json"
@@ -32,9 +47,35 @@ CRITICAL_FILES = [
     WORKSPACE / "AGENTS.md",
 ]
 
+DAILY_RE = re.compile(r'memory/\d{4}-\d{2}-\d{2}\.md$')
+
+HASH_ALGO = "blake2b"
+CHUNK_SIZE = 1 << 20
+HASH_WORKERS = 4  # hashlib releases the GIL, so threads hash in parallel
+
 
-def hash_file(path):
-    return hashlib.md5(path.read_bytes()).hexdigest()
+def hash_file(path, legacy=False):
+    """(BLAKE2b, MD5 or None) of a file, streamed in CHUNK_SIZE blocks.
+
+    legacy also computes the MD5 older states were written with, in the
+    same pass, so switching algorithms does not flag every file as changed.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    md5 = hashlib.md5() if legacy else None
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+            if md5:
+                md5.update(block)
+    return h.hexdigest(), md5.hexdigest() if md5 else None
+
+
+def hash_files(paths, legacy=False, workers=HASH_WORKERS):
+    """{path: hash_file(path)}, on a thread pool when there is more than one."""
+    if len(paths) < 2 or workers < 2:
+        return {p: hash_file(p, legacy) for p in paths}
+    with ThreadPoolExecutor(workers) as pool:
+        return dict(zip(paths, pool.map(lambda p: hash_file(p, legacy), paths)))
 
 
 def load_state():
@@ -48,6 +89,41 @@ def save_state(state):
     STATE_FILE.write_text(json.dumps(state, indent=2))
 
 
+def near_duplicate_alerts():
+    """One alert per cluster of near-identical sections spanning several files.
+
+    Clusters made only of plain daily logs (repeated heartbeat entries) are skipped.
+    """
+    files = memory_dedup.list_files(MEMORY_DIR, archive=False)
+    clusters, _ = memory_dedup.find_clusters(memory_dedup.collect_sections(files, WORKSPACE))
+    alerts = []
+    for cluster in clusters:
+        paths = list(dict.fromkeys(s["path"] for s in cluster["sections"]))
+        if len(paths) < 2 or all(DAILY_RE.match(p) for p in paths):
+            continue
+        where = ", ".join(f"{s['path']}:{s['startLine']}" for s in cluster["sections"])
+        alerts.append(f"🧬 NEAR-DUPLICATE ({cluster['similarity']:.0%}): {where}")
+    return alerts
+
+
+def duplication_summary(top=5):
+    """Chunk-level duplication for the result, with the largest blocks."""
+    sources = memory_chunks.collect(WORKSPACE, WORKSPACE / ".chunk-cache.json")
+    # The index mirrors every file it lists; copies between real files are what matter
+    sources = {k: v for k, v in sources.items() if memory_chunks.group(k) != "index"}
+    report = memory_chunks.report(sources, top)
+    memory_chunks.add_line_numbers(report["blocks"], WORKSPACE)
+    total = report["totalBytes"]
+    return {
+        "totalKB": round(total / 1024, 1),
+        "duplicatedKB": round(report["duplicatedBytes"] / 1024, 1),
+        "duplicatedPct": round(100 * report["duplicatedBytes"] / total, 1) if total else 0,
+        "sharedKBByGroup": {g: round(n / 1024, 1) for g, n in sorted(report["sharedByGroup"].items())},
+        "topBlocks": [f"{b['length']} bytes {b['source']}:{b['startLine']}-{b['endLine']} "
+                      f"also in {', '.join(b['alsoIn'])}" for b in report["blocks"]],
+    }
+
+
 def check_integrity():
     state = load_state()
     prev_files = state.get("files", {})
@@ -59,13 +135,31 @@ def check_integrity():
     all_md = list(MEMORY_DIR.glob("**/*.md"))
     all_md += [f for f in CRITICAL_FILES if f.exists()]
 
+    # Hash only files whose stat changed; states from before BLAKE2b are
+    # compared by MD5 once, then rewritten
+    legacy = state.get("hashAlgo") != HASH_ALGO
+    stats = {path: path.stat() for path in all_md}
+    unchanged = {}
+    for path, st in stats.items():
+        prev = prev_files.get(str(path.relative_to(WORKSPACE)))
+        if (not legacy and prev and prev.get("size") == st.st_size
+                and prev.get("mtime_ns") == st.st_mtime_ns and prev.get("inode") == st.st_ino):
+            unchanged[path] = prev["hash"]
+    hashed = hash_files([p for p in all_md if p not in unchanged], legacy)
+    content_changed = False
+
     for path in all_md:
         rel = str(path.relative_to(WORKSPACE))
-        size = path.stat().st_size
-        h = hash_file(path)
+        st = stats[path]
+        size = st.st_size
         total_size += size
+        if path in unchanged:
+            h = compare_h = unchanged[path]
+        else:
+            h, md5 = hashed[path]
+            compare_h = md5 if legacy else h
 
-        current_files[rel] = {"size": size, "hash": h}
+        current_files[rel] = {"size": size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino, "hash": h}
 
         if rel in prev_files:
             prev = prev_files[rel]
@@ -79,16 +173,19 @@ def check_integrity():
                     alerts.append(f"⚠️ SIZE: {rel} {direction} {change:.0%} ({prev_size}→{size} bytes)")
 
             # Hash change
-            if h != prev.get("hash"):
+            if compare_h != prev.get("hash"):
                 alerts.append(f"📝 CHANGED: {rel}")
+                content_changed = True
 
         else:
             alerts.append(f"🆕 NEW: {rel} ({size} bytes)")
+            content_changed = True
 
     # Check for deleted files
     for rel in prev_files:
         if rel not in current_files:
             alerts.append(f"🗑️ DELETED: {rel}")
+            content_changed = True
 
     # Check expected files exist
     for expected in EXPECTED_FILES:
@@ -98,14 +195,23 @@ def check_integrity():
         elif path.stat().st_size < 10:
             alerts.append(f"⚠️ EMPTY: memory/{expected}")
 
-    # Check for bloat
-    if total_size > 500_000:  # 500KB
-        alerts.append(f"⚠️ BLOAT: Total memory size {total_size/1024:.0f}KB (>500KB)")
+    # Near-duplicates only change when a file does
+    if content_changed or "nearDuplicates" not in state:
+        state["nearDuplicates"] = near_duplicate_alerts()
+    alerts += state["nearDuplicates"]
+
+    # Check for bloat, now and at the current growth rate
+    if total_size > memory_history.TOTAL_LIMIT:
+        alerts.append(f"⚠️ BLOAT: Total memory size {total_size/1024:.0f}KB "
+                      f"(>{memory_history.TOTAL_LIMIT // 1000}KB)")
+    alerts += memory_history.update({rel: f["size"] for rel, f in current_files.items()},
+                                    MEMORY_DIR / "size-history.json")
 
     # Save new state
     state["files"] = current_files
     state["totalSize"] = total_size
     state["fileCount"] = len(current_files)
+    state["hashAlgo"] = HASH_ALGO
     save_state(state)
 
     # Output
@@ -113,6 +219,7 @@ def check_integrity():
         "timestamp": datetime.now().isoformat(),
         "fileCount": len(current_files),
         "totalSizeKB": round(total_size / 1024, 1),
+        "duplication": duplication_summary(),
         "alertCount": len(alerts),
         "alerts": alerts,
         "status": "HEALTHY" if not alerts else "ALERTS"
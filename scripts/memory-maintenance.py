@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""memory-maintenance.py — run the nightly memory scripts in one process.
+
+Each script parses files through memory_sections.load(), whose cache is
+per process. Running them here instead of as separate cron steps means
+every memory file is read and parsed once for the whole pass.
+
+Usage:
+  python3 memory-maintenance.py             # all steps
+  python3 memory-maintenance.py --only score contradictions
+"""
+
+import argparse, importlib.util, os, sys, time
+from pathlib import Path
+
+import memory_sections
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+
+
+def load_script(name):
+    """Import a hyphenated script (e.g. score-memories.py) as a module."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def step_search_index():
+    import memory_search
+    conn = memory_search.connect()
+    changed, removed = memory_search.update(conn)
+    print(f"Search index: {changed} re-indexed, {removed} removed")
+
+
+def step_context_index():
+    load_script("build-context-index").main([])
+
+
+def step_score():
+    load_script("score-memories").main([])
+
+
+def step_access():
+    import memory_access
+    applied, touched = memory_access.compact()
+    pack = memory_access.build_hot_set()
+    print(f"Access log: {applied} compacted ({touched} sections); "
+          f"hot set: {len(pack['sections'])} sections")
+
+
+def step_contradictions():
+    alerts, stats = load_script("memory-contradictions").run()
+    print(f"Contradictions: {len(alerts)} alert(s) across {stats['filesScanned']} files "
+          f"({stats['filesChanged']} changed)")
+    for alert in alerts:
+        print(f"  {alert}")
+
+
+STEPS = {
+    "context-index": step_context_index,
+    "score": step_score,
+    "access": step_access,
+    "contradictions": step_contradictions,
+    "search-index": step_search_index,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly memory maintenance in one process")
+    parser.add_argument("--only", nargs="+", choices=list(STEPS), help="Run only these steps")
+    args = parser.parse_args()
+
+    os.chdir(WORKSPACE)  # build-context-index globs relative paths
+    failed = 0
+    for name in args.only or STEPS:
+        print(f"\n=== {name} ===")
+        start = time.time()
+        try:
+            STEPS[name]()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name} failed: {e}", file=sys.stderr)
+        print(f"({(time.time() - start) * 1000:.0f}ms)")
+
+    print(f"\n📄 Parsed {memory_sections.stats['parses']} files once, "
+          f"{memory_sections.stats['hits']} reuses from cache")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
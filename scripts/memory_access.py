@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""memory_access.py — section access log, compaction and the hot-set pack.
+
+Memory readers (mem0-query, build-context-index --query, the dashboard's
+/api/memory/search) call record() with the sections they returned. Each
+call is one O_APPEND write of tab-separated lines to
+memory/access-log.tsv — no locking, no JSON, no read of the scores file.
+
+compact() folds the log into accessCount/lastAccessed per section in
+memory/access-stats.json and truncates it. The stats are kept apart from
+importance-scores.json, which only covers daily-log sections: reads of
+MEMORY.md, the curated files and patterns/ count too. build_hot_set()
+then ranks every section that is scored or has been read by
+(1 + accessCount) × effective importance (BASELINE when unscored) and
+writes the top N, text included, to memory/hot-set.json, so context
+assembly reads one small file instead of scanning the corpus.
+
+Section keys are "<file name>#<heading>", as in importance-scores.json;
+text before the first heading is titled after the file name's stem.
+
+Usage:
+  python3 memory_access.py                 # compact, then rebuild the hot set
+  python3 memory_access.py --top 50
+  python3 memory_access.py --show          # print the current hot set
+"""
+
+import argparse, json, os, sys, time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import memory_scores
+import memory_sections
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+MEMORY_DIR = WORKSPACE / "memory"
+ACCESS_LOG = MEMORY_DIR / "access-log.tsv"
+STATS_FILE = MEMORY_DIR / "access-stats.json"
+SCORES_FILE = MEMORY_DIR / "importance-scores.json"
+HOT_SET_FILE = MEMORY_DIR / "hot-set.json"
+HOT_SET_SIZE = 30
+# Where a key's file may live, relative to the workspace
+SECTION_DIRS = ("memory", "memory/archive", "memory/patterns", "memory/weekly", "")
+
+
+def section_key(path, title):
+    return f"{Path(path).name}#{title}"
+
+
+def record(keys, source="", log_file=ACCESS_LOG):
+    """Append one access per key. Never raises — reads must not fail on logging."""
+    now = int(time.time())
+    lines = "".join(f"{now}\t{source}\t{key}\n" for key in keys
+                    if key and "\n" not in key)
+    if not lines:
+        return
+    try:
+        fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def write_atomic(path, data, **dump_args):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **dump_args)
+    os.replace(tmp, path)
+
+
+def load_stats(stats_file=STATS_FILE, scores_file=SCORES_FILE):
+    """{key: {"accessCount", "lastAccessed"}}.
+
+    The first time, counts already folded into importance-scores.json are
+    carried over.
+    """
+    stats_file = Path(stats_file)
+    if stats_file.exists():
+        return json.loads(stats_file.read_text(encoding="utf-8")).get("sections", {})
+    stats = {}
+    if Path(scores_file).exists():
+        data = json.loads(Path(scores_file).read_text(encoding="utf-8"))
+        for key, entry in data.get("scores", {}).items():
+            if entry.get("accessCount"):
+                stats[key] = {"accessCount": entry["accessCount"],
+                              "lastAccessed": entry.get("lastAccessed")}
+    return stats
+
+
+def compact(log_file=ACCESS_LOG, stats_file=STATS_FILE, scores_file=SCORES_FILE):
+    """Fold the access log into access-stats.json.
+
+    The log is renamed first, so readers appending meanwhile start a new
+    file. Every key is kept, scored or not. Returns (accesses applied,
+    sections touched).
+    """
+    log_file, stats_file = Path(log_file), Path(stats_file)
+    pending = log_file.with_name(log_file.name + ".compacting")
+    if not pending.exists():  # else: finish a compaction that was interrupted
+        try:
+            os.replace(log_file, pending)
+        except FileNotFoundError:
+            return 0, 0
+
+    counts, last = Counter(), {}
+    with open(pending, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t", 2)
+            if len(parts) != 3 or not parts[0].isdigit():
+                continue
+            ts, _source, key = int(parts[0]), parts[1], parts[2]
+            counts[key] += 1
+            last[key] = max(last.get(key, 0), ts)
+
+    if counts:
+        stats = load_stats(stats_file, scores_file)
+        for key, n in counts.items():
+            entry = stats.setdefault(key, {"accessCount": 0, "lastAccessed": None})
+            entry["accessCount"] += n
+            seen = datetime.fromtimestamp(last[key]).isoformat()
+            if not entry.get("lastAccessed") or entry["lastAccessed"] < seen:
+                entry["lastAccessed"] = seen
+        write_atomic(stats_file, {"updatedAt": datetime.now().isoformat(), "sections": stats},
+                     indent=1)
+    pending.unlink()
+    return sum(counts.values()), len(counts)
+
+
+def find_section(key, memory_dir=MEMORY_DIR):
+    """(path, Chunk) for a section key, or None if it is gone."""
+    name, _, title = key.partition("#")
+    workspace = Path(memory_dir).parent
+    for sub in SECTION_DIRS:
+        path = workspace / sub / name
+        if not path.is_file():
+            continue
+        for chunk in memory_sections.load(path).chunks(1, 3, preamble=True):
+            if (chunk.title or path.stem) == title:
+                return path, chunk
+    return None
+
+
+def build_hot_set(top=HOT_SET_SIZE, scores_file=SCORES_FILE, out_file=HOT_SET_FILE,
+                  memory_dir=MEMORY_DIR, stats_file=STATS_FILE):
+    """Write the top sections by (1 + accessCount) × importance, with their text."""
+    scores = memory_scores.load(scores_file)
+    stats = load_stats(stats_file, scores_file)
+    entries = {}
+    for key in set(scores) | set(stats):
+        entries[key] = {
+            "score": scores[key]["score"] if key in scores else memory_scores.BASELINE,
+            "accessCount": stats.get(key, {}).get("accessCount", 0),
+        }
+    ranked = sorted(entries.items(),
+                    key=lambda kv: ((1 + kv[1]["accessCount"]) * kv[1]["score"], kv[0]),
+                    reverse=True)
+    sections = []
+    for key, entry in ranked:
+        if len(sections) >= top:
+            break
+        found = find_section(key, memory_dir)
+        if not found:
+            continue
+        path, chunk = found
+        sections.append({
+            "key": key,
+            "path": str(path.relative_to(Path(memory_dir).parent)),
+            "startLine": chunk.line,
+            "endLine": chunk.end_line,
+            "score": entry["score"],
+            "accessCount": entry["accessCount"],
+            "rank": round((1 + entry["accessCount"]) * entry["score"], 2),
+            "text": chunk.text,
+        })
+    pack = {"updatedAt": datetime.now().isoformat(), "sections": sections}
+    write_atomic(out_file, pack, indent=1)
+    return pack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the memory access log and build the hot set")
+    parser.add_argument("--top", type=int, default=HOT_SET_SIZE, help="Sections in the hot set")
+    parser.add_argument("--show", action="store_true", help="Print the current hot set and exit")
+    args = parser.parse_args()
+
+    if not args.show:
+        applied, touched = compact()
+        print(f"Access log: {applied} access(es) to {touched} section(s) compacted")
+        pack = build_hot_set(args.top)
+        size = HOT_SET_FILE.stat().st_size
+        print(f"Hot set: {len(pack['sections'])} sections, {size / 1024:.1f} KB → {HOT_SET_FILE}")
+    else:
+        pack = json.loads(HOT_SET_FILE.read_text(encoding="utf-8"))
+
+    for s in pack["sections"][:10] if not args.show else pack["sections"]:
+        print(f"  [{s['rank']:g}] {s['path']}:{s['startLine']}-{s['endLine']} "
+              f"({s['accessCount']}×) {s['key']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""memory_chunks.py — content-defined chunk dedup report for the memory corpus.
+
+Every source is cut into content-defined chunks with a gear rolling hash
+(as in FastCDC): a chunk ends where the high bits of the hash of the last
+~WINDOW bytes are all zero, between MIN_CHUNK and MAX_CHUNK bytes, about
+2**AVG_BITS bytes on average. Boundaries depend only on nearby content, so
+a paragraph copied into another file produces the same chunks there even
+when the text around it differs. Each chunk is identified by an 8-byte
+BLAKE2b digest.
+
+Sources are memory/**/*.md (archive and weekly included) and the body of
+every entry in memory-index.json: its memory-shards/<sha1>.md file, or
+the inline "content" of an index built before shards. Chunk lists are
+cached per file by (size, mtime_ns, inode) in .chunk-cache.json, so only
+changed files are re-chunked; shards are content-addressed, so the
+index's own stat covers them.
+
+The report gives total, unique and duplicated bytes, shared bytes per
+group (memory, archive, weekly, index — the index mirrors every file it
+lists, so its share is expected; an entry is not reported as a copy of
+its own file), the sources carrying the most shared
+bytes, and the largest duplicated blocks (runs of consecutive shared
+chunks) with their line ranges and where else they appear.
+
+Used by memory-integrity.
+
+Usage:
+  python3 memory_chunks.py              # report
+  python3 memory_chunks.py --top 20
+  python3 memory_chunks.py --no-index   # copies between real files only
+  python3 memory_chunks.py --json
+"""
+
+import argparse, hashlib, json, os, random, sys, time
+from pathlib import Path
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+MEMORY_DIR = WORKSPACE / "memory"
+INDEX_FILE = WORKSPACE / "memory-index.json"
+CACHE_PATH = WORKSPACE / ".chunk-cache.json"
+CACHE_VERSION = 1  # bump when the chunking parameters change
+
+MIN_CHUNK = 64
+MAX_CHUNK = 4096
+AVG_BITS = 8       # ~256-byte chunks: small enough to catch a copied lesson
+WINDOW = 48        # bytes that influence a boundary decision
+MIN_BLOCK = 256    # smaller duplicated runs are left out of the block list
+MASK64 = (1 << 64) - 1
+BOUNDARY_MASK = ((1 << AVG_BITS) - 1) << (WINDOW - AVG_BITS)
+
+_rng = random.Random(20260301)
+GEAR = [_rng.getrandbits(64) for _ in range(256)]
+
+
+def chunk_lengths(data):
+    """Lengths of the content-defined chunks of data (bytes), in order."""
+    lengths = []
+    n = len(data)
+    start = 0
+    gear, mask = GEAR, BOUNDARY_MASK
+    while start < n:
+        end = min(n, start + MAX_CHUNK)
+        first = start + MIN_CHUNK
+        cut = end
+        h = 0
+        # Hashing starts WINDOW bytes before the first allowed boundary,
+        # so every candidate boundary sees a full window
+        for j in range(max(start, first - WINDOW), end):
+            h = ((h << 1) + gear[data[j]]) & MASK64
+            if j >= first and not h & mask:
+                cut = j + 1
+                break
+        lengths.append(cut - start)
+        start = cut
+    return lengths
+
+
+def chunk(data):
+    """[[digest, length], ...] for data."""
+    result, offset = [], 0
+    for length in chunk_lengths(data):
+        digest = hashlib.blake2b(data[offset:offset + length], digest_size=8).hexdigest()
+        result.append([digest, length])
+        offset += length
+    return result
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def write_cache(files, path=CACHE_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def group(label):
+    """memory, archive, weekly or index, for a source label."""
+    if label.startswith(INDEX_FILE.name):
+        return "index"
+    parts = Path(label).parts
+    return parts[1] if len(parts) > 2 and parts[1] in ("archive", "weekly") else "memory"
+
+
+def mirrors(a, b):
+    """True if one label is the index entry of the other file (index:path vs path)."""
+    return a == f"{INDEX_FILE.name}:{b}" or b == f"{INDEX_FILE.name}:{a}"
+
+
+def _entry_body(index_path, entry):
+    """Bytes of one index entry: its shard, or inline content; None if the shard is gone."""
+    if not entry.get("shard"):
+        return entry.get("content", "").encode("utf-8")
+    try:
+        return (Path(index_path).parent / entry["shard"]).read_bytes()
+    except OSError:
+        print(f"memory_chunks: missing shard {entry['shard']} for {entry['path']}",
+              file=sys.stderr)
+        return None
+
+
+def read_sources(rel, path):
+    """{source label: bytes} for one file; the index yields one source per entry."""
+    path = Path(path)
+    if path.name != INDEX_FILE.name:
+        return {rel: path.read_bytes()}
+    with open(path, encoding="utf-8") as f:
+        index = json.load(f)
+    sources = {}
+    for entry in index.get("files", []):
+        if not entry.get("path"):
+            continue
+        data = _entry_body(path, entry)
+        if data is not None:
+            sources[f"{rel}:{entry['path']}"] = data
+    return sources
+
+
+def read_source(label, workspace=WORKSPACE):
+    """Bytes of a single source label: the file, or one index entry's body."""
+    rel, _, entry_path = label.partition(":")
+    path = Path(workspace) / rel
+    if not entry_path:
+        return path.read_bytes()
+    with open(path, encoding="utf-8") as f:
+        index = json.load(f)
+    for entry in index.get("files", []):
+        if entry.get("path") == entry_path:
+            return _entry_body(path, entry) or b""
+    return b""
+
+
+def list_files(workspace=WORKSPACE):
+    """(relative name, path) of every chunked file."""
+    workspace = Path(workspace)
+    files = [(str(p.relative_to(workspace)), p) for p in sorted((workspace / "memory").glob("**/*.md"))]
+    index = workspace / INDEX_FILE.name
+    if index.exists():
+        files.append((index.name, index))
+    return files
+
+
+def collect(workspace=WORKSPACE, cache_path=CACHE_PATH):
+    """{source label: [[digest, length], ...]}, re-chunking only changed files."""
+    cache = load_cache(cache_path)
+    fresh = {}
+    sources = {}
+    dirty = False
+    for rel, path in list_files(workspace):
+        key = _stat_key(path)
+        entry = cache.get(rel)
+        if not entry or entry["stat"] != key:
+            entry = {"stat": key,
+                     "sources": {label: chunk(data) for label, data in read_sources(rel, path).items()}}
+            dirty = True
+        fresh[rel] = entry
+        sources.update(entry["sources"])
+    if dirty or set(fresh) != set(cache):
+        write_cache(fresh, cache_path)
+    return sources
+
+
+def report(sources, top=10):
+    """Duplication summary of {label: chunks}; see the module docstring."""
+    size, where = {}, {}
+    total = 0
+    for label, chunks in sources.items():
+        for digest, length in chunks:
+            size[digest] = length
+            where.setdefault(digest, []).append(label)
+            total += length
+    unique = sum(size.values())
+
+    per_source, per_group = {}, {}
+    blocks = []
+    for label, chunks in sources.items():
+        offset = 0
+        run = None  # [start, length, other sources]
+        for digest, length in chunks + [[None, 0]]:
+            # An index entry matching its own file is the mirror, not a copy
+            labels = [l for l in where.get(digest, ()) if not mirrors(label, l)]
+            others = {l for l in labels if l != label}
+            shared = len(labels) > 1
+            if shared:
+                per_source[label] = per_source.get(label, 0) + length
+                per_group[group(label)] = per_group.get(group(label), 0) + length
+            if run and shared and run[2] & others:
+                run[1] += length
+                run[2] &= others
+            else:
+                if run and run[1] >= MIN_BLOCK:
+                    blocks.append({"source": label, "offset": run[0], "length": run[1],
+                                   "alsoIn": sorted(run[2])})
+                run = [offset, length, others] if shared and others else None
+            offset += length
+
+    # A block copied between A and B shows up from both sides, and again from
+    # their index entries; keep one, preferably a real file's
+    def file_of(label):
+        return label.split(":", 1)[1] if group(label) == "index" else label
+
+    seen, unique_blocks = set(), []
+    for b in sorted(blocks, key=lambda b: (-b["length"], group(b["source"]) == "index", b["source"])):
+        key = (frozenset(map(file_of, [b["source"], *b["alsoIn"]])), b["length"])
+        if key not in seen:
+            seen.add(key)
+            unique_blocks.append(b)
+
+    return {
+        "sources": len(sources),
+        "totalBytes": total,
+        "uniqueBytes": unique,
+        "duplicatedBytes": total - unique,
+        "sharedByGroup": per_group,
+        "topSources": sorted(per_source.items(), key=lambda kv: -kv[1])[:top],
+        "blocks": unique_blocks[:top],
+    }
+
+
+def add_line_numbers(blocks, workspace=WORKSPACE):
+    """Fill in startLine/endLine for report blocks (reads only their sources)."""
+    cache = {}
+    for b in blocks:
+        if b["source"] not in cache:
+            cache[b["source"]] = read_source(b["source"], workspace)
+        data = cache[b["source"]]
+        b["startLine"] = data.count(b"\n", 0, b["offset"]) + 1
+        b["endLine"] = b["startLine"] + data.count(b"\n", b["offset"], b["offset"] + b["length"])
+    return blocks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-defined chunk dedup report")
+    parser.add_argument("--top", type=int, default=10, help="Sources and blocks to list")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Leave memory-index.json out (it mirrors every file)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sources = collect()
+    if args.no_index:
+        sources = {k: v for k, v in sources.items() if group(k) != "index"}
+    result = report(sources, args.top)
+    add_line_numbers(result["blocks"])
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0
+    pct = result["duplicatedBytes"] / result["totalBytes"] if result["totalBytes"] else 0
+    print(f"{result['sources']} sources, {result['totalBytes'] / 1024:.0f} KB; "
+          f"duplicated {result['duplicatedBytes'] / 1024:.0f} KB ({pct:.0%}) ({elapsed:.0f}ms)")
+    print("Shared bytes by group: " + ", ".join(
+        f"{g} {n / 1024:.0f} KB" for g, n in sorted(result["sharedByGroup"].items())))
+    print("\nMost duplicated bytes:")
+    for label, n in result["topSources"]:
+        print(f"  {n / 1024:7.1f} KB  {label}")
+    print("\nLargest duplicated blocks:")
+    for b in result["blocks"]:
+        also = ", ".join(b["alsoIn"][:3]) + (f" +{len(b['alsoIn']) - 3}" if len(b["alsoIn"]) > 3 else "")
+        print(f"  {b['length'] / 1024:6.1f} KB  {b['source']}:{b['startLine']}-{b['endLine']}  also in {also}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
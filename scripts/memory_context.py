@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""memory_context.py — pack the most useful memory sections into a token budget.
+
+Candidates are sections with a token estimate: the rows of
+memory/context-index.json, or sections parsed straight from a list of
+files. Each gets a value from three signals in [0, 1]:
+
+  relevance   BM25 score from the context index, relative to the best hit
+  importance  effective score from memory_scores / 10
+  recency     0.5 ** (age in days / RECENCY_HALF_LIFE) for dated files
+
+and a 0/1 knapsack picks the set with the highest total value whose
+estimated tokens fit the budget. Without a query every indexed section is
+a candidate, so the knapsack only sees a shortlist: the best by value per
+token, SHORTLIST_FACTOR times as many as the budget holds. The result lists each section's source
+line range, in file order, so the prompt can be assembled from it with
+render() — its size is known before any model is called.
+
+Usage:
+  python3 memory_context.py --budget 4000 --query "ollama routing"
+  python3 memory_context.py --budget 2000 --text   # no query: importance + recency
+  python3 memory_context.py --budget 8000 --json
+"""
+
+import argparse, importlib.util, json, re, sys
+from datetime import date, datetime
+from pathlib import Path
+
+import memory_scores
+import memory_sections
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+INDEX_FILE = WORKSPACE / "memory" / "context-index.json"
+SCORES_FILE = WORKSPACE / "memory" / "importance-scores.json"
+
+RECENCY_HALF_LIFE = 7      # days
+UNDATED_RECENCY = 0.5      # people.md, lessons.md etc. are not dated
+MAX_CAPACITY_UNITS = 2000  # knapsack resolution; tokens are bucketed above this
+SHORTLIST_FACTOR = 4       # knapsack this many times the items a greedy fill takes
+WEIGHTS = {"relevance": 0.6, "importance": 0.25, "recency": 0.15}
+WEIGHTS_NO_QUERY = {"relevance": 0.0, "importance": 0.6, "recency": 0.4}
+
+DATE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})')
+
+
+def recency(path, today):
+    m = DATE_RE.match(Path(path).name)
+    if not m:
+        return UNDATED_RECENCY
+    age = (today - date.fromisoformat(m.group(1))).days
+    return 0.5 ** (max(0, age) / RECENCY_HALF_LIFE)
+
+
+def _context_index_module():
+    """build-context-index.py, whose query() ranks sections against the index."""
+    path = Path(__file__).resolve().parent / "build-context-index.py"
+    spec = importlib.util.spec_from_file_location("build_context_index", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def candidates_from_index(index, query=None):
+    """Sections of a loaded context index; with a query, only matching ones."""
+    rows = index["sections"]
+    if not query:
+        return [{"path": p, "startLine": s, "endLine": e, "title": t, "tokens": n, "relevance": 0.0}
+                for p, s, e, t, _summary, n in rows]
+    hits = _context_index_module().query(index, query, k=None)
+    top = max((h["score"] for h in hits), default=0) or 1
+    return [{"path": h["path"], "startLine": h["startLine"], "endLine": h["endLine"],
+             "title": h["title"], "tokens": h["tokens"], "relevance": h["score"] / top}
+            for h in hits]
+
+
+def candidates_from_files(paths, min_level=1, max_level=3):
+    """Sections parsed directly from files (for text not in the index yet)."""
+    result = []
+    for path in paths:
+        doc = memory_sections.load(path)
+        for chunk in doc.chunks(min_level, max_level, preamble=True):
+            if not chunk.text:
+                continue
+            result.append({"path": str(path), "startLine": chunk.line, "endLine": chunk.end_line,
+                           "title": chunk.title or Path(path).stem,
+                           "tokens": memory_sections.estimate_tokens(chunk.text),
+                           "relevance": 0.0})
+    return result
+
+
+def shortlist(items, capacity, factor=SHORTLIST_FACTOR):
+    """Indices of the items (weight, value) worth a knapsack, in order.
+
+    Items that fit, best value per weight first, factor times as many as a
+    greedy fill of capacity takes; the rest could only displace better ones.
+    """
+    order = sorted((i for i, (weight, value) in enumerate(items) if weight <= capacity and value > 0),
+                   key=lambda i: -items[i][1] / items[i][0])
+    used = fits = 0
+    for i in order:
+        if used + items[i][0] > capacity:
+            break
+        used += items[i][0]
+        fits += 1
+    return sorted(order[:factor * max(1, fits)])
+
+
+def knapsack(items, capacity):
+    """Indices of items (weight, value) maximising value with total weight <= capacity.
+
+    Runs over shortlist() with one rolling row of best values; each item
+    keeps a byte only for the capacities it can fill, to trace the choice
+    back, so memory follows the shortlist rather than the corpus.
+    """
+    picks = shortlist(items, capacity)
+    best = [0.0] * (capacity + 1)
+    taken = []
+    for i in picks:
+        weight, value = items[i]
+        took = bytearray(capacity + 1 - weight)  # took[c - weight]: capacity c uses the item
+        for c in range(capacity, weight - 1, -1):
+            v = best[c - weight] + value
+            if v > best[c]:
+                best[c] = v
+                took[c - weight] = 1
+        taken.append(took)
+    chosen, c = [], capacity
+    for n in range(len(picks) - 1, -1, -1):
+        weight = items[picks[n]][0]
+        if c >= weight and taken[n][c - weight]:
+            chosen.append(picks[n])
+            c -= weight
+    return chosen[::-1]
+
+
+def pack(candidates, budget, query=None, scores=None, today=None, weights=None):
+    """Pick candidates for a token budget; returns {"budget", "tokens", "sections"}.
+
+    Each section is charged its estimated tokens plus its render() header,
+    rounded up to the knapsack's bucket size, so the rendered text never
+    exceeds the budget.
+    """
+    today = today or date.today()
+    scores = memory_scores.load(SCORES_FILE, today) if scores is None else scores
+    weights = weights or (WEIGHTS if query else WEIGHTS_NO_QUERY)
+    unit = max(1, -(-budget // MAX_CAPACITY_UNITS))
+    items = []
+    for cand in candidates:
+        key = f"{Path(cand['path']).name}#{cand['title']}"
+        importance = scores.get(key, {}).get("score", memory_scores.BASELINE) / 10
+        cand["value"] = round(weights["relevance"] * cand["relevance"]
+                              + weights["importance"] * importance
+                              + weights["recency"] * recency(cand["path"], today), 4)
+        cand["cost"] = cand["tokens"] + memory_sections.estimate_tokens(_header(cand) + "\n\n")
+        items.append((max(1, -(-cand["cost"] // unit)), cand["value"]))
+    chosen = [candidates[i] for i in knapsack(items, budget // unit)]
+    chosen.sort(key=lambda c: (c["path"], c["startLine"]))
+    return {"budget": budget, "tokens": sum(c["cost"] for c in chosen), "sections": chosen}
+
+
+def _header(section):
+    return f"<!-- {section['path']}:{section['startLine']}-{section['endLine']} -->\n"
+
+
+def render(packed, workspace=WORKSPACE):
+    """Text of the packed sections, each headed by its source line range."""
+    parts = []
+    for s in packed["sections"]:
+        path = Path(s["path"])
+        doc = memory_sections.load(path if path.is_absolute() else Path(workspace) / path)
+        text = "\n".join(doc.lines[s["startLine"] - 1:s["endLine"]]).strip()
+        parts.append(_header(s) + text)
+    return "\n\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack memory sections into a token budget")
+    parser.add_argument("--budget", type=int, default=4000, help="Token budget")
+    parser.add_argument("--query", help="Rank by relevance to this text as well")
+    parser.add_argument("--index", default=str(INDEX_FILE))
+    parser.add_argument("--text", action="store_true", help="Print the assembled context")
+    parser.add_argument("--json", action="store_true", help="Print the packing as JSON")
+    args = parser.parse_args()
+
+    with open(args.index, encoding="utf-8") as f:
+        index = json.load(f)
+    start = datetime.now()
+    packed = pack(candidates_from_index(index, args.query), args.budget, args.query)
+    elapsed = (datetime.now() - start).total_seconds() * 1000
+
+    if args.json:
+        print(json.dumps(packed, indent=2, ensure_ascii=False))
+    elif args.text:
+        print(render(packed, Path(args.index).resolve().parent.parent))
+    else:
+        for s in packed["sections"]:
+            print(f"  {s['path']}:{s['startLine']}-{s['endLine']} ~{s['tokens']} tok "
+                  f"v={s['value']:.2f} {s['title']}")
+        print(f"{len(packed['sections'])} sections, ~{packed['tokens']}/{args.budget} tokens "
+              f"({elapsed:.0f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""memory_dedup.py — near-duplicate memory sections via MinHash and LSH.
+
+Every H2/H3 section (and file preamble) is reduced to a set of word
+shingles (SHINGLE_WORDS consecutive words). A MinHash signature of
+NUM_PERM values estimates the Jaccard similarity of two shingle sets, and
+locality-sensitive hashing splits each signature into BANDS bands: two
+sections become a candidate pair only if some band is identical, which
+happens with probability 1 - (1 - s^ROWS)^BANDS for similarity s. With
+16 bands of 4 rows the curve rises around s ≈ 0.5, so pairs at or above
+the default 0.6 threshold are found with high probability. Candidates
+are confirmed with the exact Jaccard of their shingle sets and grouped
+into clusters with union-find; each bucket member is compared with the
+bucket's first member only, so the number of comparisons stays linear
+in the number of sections even where many of them look alike.
+
+In --suggest mode each cluster gets a merge plan: keep the largest
+section (a curated file wins over a daily log), drop the others, and
+carry over the lines only they contain.
+
+Usage:
+  python3 memory_dedup.py                     # clusters in memory/ (archive + weekly too)
+  python3 memory_dedup.py --threshold 0.8
+  python3 memory_dedup.py --suggest           # merge/dedupe plan per cluster
+  python3 memory_dedup.py --json
+"""
+
+import argparse, json, random, re, sys, time, zlib
+from pathlib import Path
+
+import memory_sections
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+MEMORY_DIR = WORKSPACE / "memory"
+
+SHINGLE_WORDS = 5
+MIN_SHINGLES = 8       # shorter sections match each other by accident
+NUM_PERM = 64
+BANDS = 16             # BANDS * ROWS == NUM_PERM
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.6        # exact Jaccard a candidate pair must reach
+PRIME = (1 << 61) - 1
+SEED = 42              # fixed, so signatures are comparable across runs
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+DAILY_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+_rng = random.Random(SEED)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Set of 32-bit hashes of every run of size consecutive lower-cased words."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+            for i in range(len(words) - size + 1)}
+
+
+def minhash(hashes):
+    """NUM_PERM minimum values of (a·x + b) mod PRIME over the shingle hashes."""
+    return [min((a * x + b) % PRIME for x in hashes) for a, b in PERMUTATIONS]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def collect_sections(paths, workspace=WORKSPACE):
+    """Sections worth comparing, as dicts with path, lines, title, text and shingles."""
+    sections = []
+    for path in paths:
+        doc = memory_sections.load(path)
+        rel = str(Path(path).relative_to(workspace)) if Path(path).is_absolute() else str(path)
+        for chunk in doc.chunks(2, 3, preamble=True):
+            sh = shingles(chunk.body if chunk.title else chunk.text)
+            if len(sh) < MIN_SHINGLES:
+                continue
+            sections.append({"path": rel, "startLine": chunk.line, "endLine": chunk.end_line,
+                             "title": chunk.title or Path(path).stem, "text": chunk.text,
+                             "shingles": sh})
+    return sections
+
+
+def find_clusters(sections, threshold=THRESHOLD):
+    """Clusters of near-duplicate sections, largest first.
+
+    Sections with identical signatures are collapsed first: the first of
+    them stands for the rest in the LSH buckets, and each other one is
+    confirmed against it once. Within a bucket every member is compared
+    with the bucket's first member only, and pairs already in one cluster
+    are not compared again, so a bucket of k look-alike daily sections
+    costs k - 1 comparisons rather than k²/2.
+
+    Returns (clusters, stats); a cluster is {"similarity": lowest Jaccard
+    of the pairs that joined it, "sections": [...]}, sections by size.
+    """
+    parent = list(range(len(sections)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    confirmed = {}
+    compared = set()
+
+    def confirm(i, j):
+        if root(i) == root(j) or (i, j) in compared:
+            return
+        compared.add((i, j))
+        sim = jaccard(sections[i]["shingles"], sections[j]["shingles"])
+        if sim >= threshold:
+            confirmed[(i, j)] = sim
+            parent[root(i)] = root(j)
+
+    same = {}
+    for i, s in enumerate(sections):
+        same.setdefault(tuple(minhash(s["shingles"])), []).append(i)
+    for members in same.values():
+        for j in members[1:]:
+            confirm(members[0], j)
+
+    for band in range(BANDS):
+        lo = band * ROWS
+        buckets = {}
+        for signature, members in same.items():
+            buckets.setdefault(signature[lo:lo + ROWS], []).append(members[0])
+        for members in buckets.values():
+            for j in members[1:]:
+                confirm(members[0], j)
+
+    groups = {}
+    for (i, j), sim in confirmed.items():
+        group = groups.setdefault(root(i), [set(), sim])
+        group[0].update((i, j))
+        group[1] = min(group[1], sim)
+    clusters = []
+    for members, sim in groups.values():
+        ordered = sorted(members, key=lambda i: (-len(sections[i]["text"]), sections[i]["path"]))
+        clusters.append({"similarity": round(sim, 3),
+                         "sections": [sections[i] for i in ordered]})
+    clusters.sort(key=lambda c: (-len(c["sections"]), -c["similarity"]))
+    stats = {"sections": len(sections), "candidatePairs": len(compared), "confirmedPairs": len(confirmed)}
+    return clusters, stats
+
+
+def suggest_merge(cluster):
+    """Merge plan: the section to keep, the ones to drop, and lines to carry over.
+
+    Curated files (people.md, lessons.md…) are preferred over dated logs,
+    then the longer section.
+    """
+    def rank(s):
+        return (DAILY_RE.match(Path(s["path"]).name) is None, len(s["text"]))
+
+    keep = max(cluster["sections"], key=rank)
+    kept_lines = {line.strip() for line in keep["text"].split("\n")}
+    drop = []
+    for s in cluster["sections"]:
+        if s is keep:
+            continue
+        extra = [line for line in s["text"].split("\n")[1:]
+                 if line.strip() and line.strip() not in kept_lines]
+        drop.append({"path": s["path"], "startLine": s["startLine"], "endLine": s["endLine"],
+                     "title": s["title"], "mergeLines": extra})
+    return {"keep": {"path": keep["path"], "startLine": keep["startLine"],
+                     "endLine": keep["endLine"], "title": keep["title"]},
+            "drop": drop}
+
+
+def list_files(memory_dir=MEMORY_DIR, archive=True):
+    files = sorted(Path(memory_dir).glob("**/*.md"))
+    if not archive:
+        files = [f for f in files if "archive" not in f.parts]
+    return files
+
+
+def _location(s):
+    return f"{s['path']}:{s['startLine']}-{s['endLine']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate memory sections (MinHash/LSH)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Minimum Jaccard similarity of word shingles")
+    parser.add_argument("--no-archive", action="store_true", help="Leave memory/archive out")
+    parser.add_argument("--suggest", action="store_true", help="Print a merge plan per cluster")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sections = collect_sections(list_files(archive=not args.no_archive))
+    clusters, stats = find_clusters(sections, args.threshold)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        out = []
+        for c in clusters:
+            entry = {"similarity": c["similarity"],
+                     "sections": [{k: s[k] for k in ("path", "startLine", "endLine", "title")}
+                                  for s in c["sections"]]}
+            if args.suggest:
+                entry["merge"] = suggest_merge(c)
+            out.append(entry)
+        print(json.dumps({**stats, "clusters": out}, indent=2, ensure_ascii=False))
+        return 0
+
+    for c in clusters:
+        print(f"[{c['similarity']:.2f}] {len(c['sections'])} sections")
+        if args.suggest:
+            plan = suggest_merge(c)
+            print(f"  keep  {_location(plan['keep'])} {plan['keep']['title']}")
+            for d in plan["drop"]:
+                print(f"  drop  {_location(d)} {d['title']}")
+                for line in d["mergeLines"]:
+                    print(f"          + {line.strip()[:100]}")
+        else:
+            for s in c["sections"]:
+                print(f"  {_location(s)} {s['title']}")
+    print(f"{len(clusters)} cluster(s) from {stats['sections']} sections, "
+          f"{stats['candidatePairs']} candidate pairs ({elapsed:.0f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
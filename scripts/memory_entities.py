@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""memory_entities.py — one entity recognizer shared by the memory scripts.
+
+Entities come from the workspace files, not from code: people from the H2
+headings in memory/people.md, projects from memory/projects.md (plus any
+"Name (TICKER)" picks listed there), and stocks/crypto from the
+investments watchlist in investments.json. A short list of generic money
+words (MONEY_TERMS) rides along so scoring needs only one scan.
+
+All names are compiled into a single regex built from a trie of the
+lower-cased patterns, so a text is scanned once in C no matter how many
+entities there are. Person names and tickers are matched case-sensitively
+("Dag" the person, not "dag" the Norwegian word).
+
+Used by score-memories, memory-contradictions and build-relations.
+
+Usage:
+  python3 memory_entities.py                     # list known entities
+  python3 memory_entities.py memory/2026-02-28.md  # mentions with offsets
+"""
+
+import json, os, re, sys
+from collections import namedtuple
+from pathlib import Path
+
+import memory_sections
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+SOURCES = ("memory/people.md", "memory/projects.md", "investments.json")
+
+# Generic finance vocabulary, matched case-insensitively as kind "money"
+MONEY_TERMS = ("invest", "stock", "portfolio", "MACD", "crossover", "aksje",
+               "ROE", "price", "earnings", "dividend", "crypto",
+               "BTC", "ETH", "USD", "NOK", "EUR")
+CASE_SENSITIVE_TERMS = ("PE",)  # "PE 8" — too ambiguous in lower case
+MONEY_KINDS = frozenset({"stock", "crypto", "money"})
+
+PICK_RE = re.compile(r'([A-Z][\w&.]*(?: [A-Z][\w&.]*)*) \(([A-Z]{2,6}(?: [A-Z])?)\)')
+TAG_RE = re.compile(r'\s*#\w+')
+PAREN_RE = re.compile(r'\s*\(.*?\)')
+
+# key is the slug other scripts use (relations.json ids); ticker only for stocks/crypto
+Entity = namedtuple("Entity", "key kind name ticker")
+Match = namedtuple("Match", "start end text entity")
+
+_cached = None  # (source signature, EntityRecognizer)
+
+
+def slug(name):
+    return name.lower().replace(" ", "-")
+
+
+def base_symbol(symbol):
+    """NOVO-B.CO -> NOVO, SECU B -> SECU, BTC-USD -> BTC."""
+    return re.split(r'[-. ]', symbol, 1)[0]
+
+
+def trie_regex(patterns):
+    """Regex source matching any of patterns, shaped as a trie.
+
+    Shared prefixes are factored out, so the engine tests each position
+    against one branch per distinct first character instead of every
+    pattern. Longer continuations are tried before shorter ones.
+    """
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return _trie_regex(trie) or "(?!)"
+
+
+def _trie_regex(node):
+    alts = [re.escape(ch) + _trie_regex(child)
+            for ch, child in sorted(node.items()) if ch != ""]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class EntityRecognizer:
+    """Finds every known entity mention in a text in one regex pass."""
+
+    def __init__(self):
+        self.entities = {}   # key -> Entity
+        self._patterns = {}  # lower-cased pattern -> [(exact form or None, key)]
+        self._regex = None
+
+    def add(self, entity, *names, case_sensitive=False):
+        """Register an entity (merged by key) and the names it is mentioned by.
+
+        A later ticker wins, so the watchlist's exchange symbol (SAMPO.HE)
+        replaces the short one a projects.md pick lists (SAMPO).
+        """
+        old = self.entities.get(entity.key)
+        if old:
+            entity = old._replace(ticker=entity.ticker or old.ticker)
+        self.entities[entity.key] = entity
+        for name in names:
+            name = name.strip()
+            if len(name) < 2:
+                continue
+            forms = self._patterns.setdefault(name.lower(), [])
+            form = (name if case_sensitive else None, entity.key)
+            if form not in forms:
+                forms.append(form)
+        self._regex = None
+
+    def compile(self):
+        self._regex = re.compile(self.pattern, re.I)
+        return self
+
+    @property
+    def pattern(self):
+        """Regex source matching any known name (use with re.I), for
+        callers that fold entity matching into a larger alternation."""
+        return r'(?<!\w)' + trie_regex(self._patterns) + r'(?!\w)'
+
+    def names(self):
+        """Every registered name, lower-cased."""
+        return list(self._patterns)
+
+    def lookup(self, found, kinds=None, fold_case=False):
+        """Entities a matched string stands for, honouring case sensitivity."""
+        result = []
+        for exact, key in self._patterns.get(found.lower(), ()):
+            if exact and not fold_case and exact != found:
+                continue
+            entity = self.entities[key]
+            if kinds and entity.kind not in kinds:
+                continue
+            result.append(entity)
+        return result
+
+    def find(self, text, kinds=None, fold_case=False):
+        """All mentions as Match(start, end, text, entity), in text order.
+
+        kinds limits the result to those entity kinds. fold_case ignores the
+        case-sensitive flag, for text that is already lower-cased.
+        """
+        if self._regex is None:
+            self.compile()
+        matches = []
+        for m in self._regex.finditer(text):
+            found = m.group()
+            for entity in self.lookup(found, kinds, fold_case):
+                matches.append(Match(m.start(), m.end(), found, entity))
+        return matches
+
+    def kinds(self, text):
+        """Set of entity kinds mentioned in text."""
+        return {m.entity.kind for m in self.find(text)}
+
+
+def _add_people(rec, path):
+    for section in memory_sections.load(path).headings(2):
+        name = PAREN_RE.sub("", section.title).strip()
+        if not name:
+            continue
+        first = name.split()[0]
+        rec.add(Entity(slug(name), "person", name, None), name, first, case_sensitive=True)
+
+
+def _add_projects(rec, path):
+    doc = memory_sections.load(path)
+    for section in doc.headings(2):
+        name = PAREN_RE.sub("", TAG_RE.sub("", section.title)).strip()
+        if name:
+            rec.add(Entity(slug(name), "project", name, None), name)
+        # Investment picks listed as "Protector Forsikring (PROT)", also
+        # known by their first word ("Protector")
+        for m in PICK_RE.finditer(section.full_text):
+            _add_asset(rec, m.group(2), m.group(1), "stock", ticker=m.group(2), short_name=True)
+
+
+def _add_asset(rec, symbol, name, kind, ticker, short_name=False):
+    """Register an asset by name and symbols; short_name adds the first word
+    of the name too (not for the watchlist, where "Evolution" is a word)."""
+    first = name.split()[0]
+    names = [name, symbol, base_symbol(symbol)] + ([first] if short_name else [])
+    rec.add(Entity(first.lower(), kind, name, ticker), *names, case_sensitive=True)
+
+
+def _add_watchlist(rec, path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for asset in data.get("assets", []):
+        kind = "crypto" if asset.get("category") == "crypto" else "stock"
+        if asset.get("symbol") and asset.get("name"):
+            _add_asset(rec, asset["symbol"], asset["name"], kind, ticker=asset["symbol"])
+
+
+def build(workspace=WORKSPACE):
+    """Build a recognizer from the workspace files; missing files are skipped."""
+    rec = EntityRecognizer()
+    loaders = (_add_people, _add_projects, _add_watchlist)
+    for rel, loader in zip(SOURCES, loaders):
+        path = Path(workspace) / rel
+        try:
+            loader(rec, path)
+        except (OSError, ValueError):
+            continue
+    for term in MONEY_TERMS:
+        rec.add(Entity(term.lower(), "money", term, None), term)
+    for term in CASE_SENSITIVE_TERMS:
+        rec.add(Entity(term.lower(), "money", term, None), term, case_sensitive=True)
+    return rec.compile()
+
+
+def load(workspace=WORKSPACE):
+    """Cached build(); rebuilt when any source file's (mtime, size) changes."""
+    global _cached
+    signature = []
+    for rel in SOURCES:
+        try:
+            st = os.stat(Path(workspace) / rel)
+            signature.append((rel, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((rel, None, None))
+    signature = (str(workspace), tuple(signature))
+    if _cached and _cached[0] == signature:
+        return _cached[1]
+    rec = build(workspace)
+    _cached = (signature, rec)
+    return rec
+
+
+def main():
+    rec = load()
+    if len(sys.argv) < 2:
+        for entity in sorted(rec.entities.values(), key=lambda e: (e.kind, e.key)):
+            ticker = f" ({entity.ticker})" if entity.ticker else ""
+            print(f"  {entity.kind:8} {entity.key:22} {entity.name}{ticker}")
+        print(f"{len(rec.entities)} entities, {len(rec._patterns)} patterns")
+        return 0
+    for path in sys.argv[1:]:
+        text = Path(path).read_text(encoding="utf-8")
+        for m in rec.find(text):
+            print(f"{path}:{m.start}-{m.end} {m.entity.kind:8} {m.entity.key:20} {m.text!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""memory_history.py — size history of the memory files, with growth alerts.
+
+memory-integrity calls update() once per run with every file's size.
+Each series (the total, and one per file) is a list of [timestamp, bytes]
+points in three tiers:
+
+  raw     a point per run in which the size changed, for RAW_DAYS
+  daily   the last point of each day, for DAILY_DAYS
+  weekly  the last point of each ISO week, kept for good
+
+Points only ever move down a tier, so the file stays small (about one
+point per file per week of history) while recent changes keep full
+resolution. A size between points is the last recorded one.
+
+Alerts:
+  GROWTH     total grew more than TOTAL_GROWTH_ALERT of its size in a week,
+             or one file grew more than FILE_GROWTH_ALERT bytes in a week
+  PROJECTED  at the rate of the last PROJECTION_DAYS, the total (or a file)
+             reaches its limit within PROJECTION_ALERT_DAYS
+
+Usage:
+  python3 memory_history.py              # total trend and top growers
+  python3 memory_history.py --file memory/lessons.md
+"""
+
+import argparse, json, os, sys, time
+from datetime import date, datetime
+from pathlib import Path
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+HISTORY_FILE = WORKSPACE / "memory" / "size-history.json"
+VERSION = 1
+
+DAY = 86400
+RAW_DAYS = 7
+DAILY_DAYS = 90
+TOTAL_LIMIT = 500_000          # bytes; also memory-integrity's BLOAT threshold
+FILE_LIMIT = 50_000            # bytes; one file injected into a prompt
+TOTAL_GROWTH_ALERT = 0.20      # fraction of the total per week
+FILE_GROWTH_ALERT = 10_000     # bytes per week
+GROWTH_DAYS = 7
+PROJECTION_DAYS = 14
+PROJECTION_ALERT_DAYS = 30
+
+
+def empty():
+    return {"raw": [], "daily": [], "weekly": []}
+
+
+def load(path=HISTORY_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = None
+    if not history or history.get("version") != VERSION:
+        history = {"version": VERSION, "since": None, "total": empty(), "files": {}}
+    return history
+
+
+def save(history, path=HISTORY_FILE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def points(series):
+    """All points of a series, oldest first."""
+    return series["weekly"] + series["daily"] + series["raw"]
+
+
+def latest(series):
+    for tier in ("raw", "daily", "weekly"):
+        if series[tier]:
+            return series[tier][-1]
+    return None
+
+
+def value_at(series, ts):
+    """Size at time ts: the last point at or before it, None before the first."""
+    value = None
+    for t, size in points(series):
+        if t > ts:
+            break
+        value = size
+    return value
+
+
+def _day(ts):
+    return date.fromtimestamp(ts).isoformat()
+
+
+def _week(ts):
+    year, week, _ = date.fromtimestamp(ts).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _fold(points, bucket):
+    """The last point of each bucket, in order."""
+    last = {}
+    for point in points:
+        last[bucket(point[0])] = point
+    return list(last.values())
+
+
+def downsample(series, now):
+    """Move raw points older than RAW_DAYS to daily, daily older than DAILY_DAYS to weekly."""
+    cut = now - RAW_DAYS * DAY
+    old = [p for p in series["raw"] if p[0] < cut]
+    if old:
+        series["raw"] = series["raw"][len(old):]
+        series["daily"] = _fold(series["daily"] + old, _day)
+    cut = now - DAILY_DAYS * DAY
+    old = [p for p in series["daily"] if p[0] < cut]
+    if old:
+        series["daily"] = series["daily"][len(old):]
+        series["weekly"] = _fold(series["weekly"] + old, _week)
+
+
+def _append(series, now, size):
+    last = latest(series)
+    if last is None or last[1] != size:
+        series["raw"].append([now, size])
+
+
+def record(history, sizes, now=None):
+    """Add one run's {path: bytes}; files missing from sizes are recorded as 0."""
+    now = int(now or time.time())
+    if history["since"] is None:
+        history["since"] = now
+    files = history["files"]
+    for path, size in sizes.items():
+        _append(files.setdefault(path, empty()), now, size)
+    for path, series in files.items():
+        if path not in sizes:
+            _append(series, now, 0)
+    _append(history["total"], now, sum(sizes.values()))
+    for series in [history["total"], *files.values()]:
+        downsample(series, now)
+    # Files deleted long ago have nothing left to say
+    for path in [p for p, s in files.items()
+                 if latest(s)[1] == 0 and latest(s)[0] < now - DAILY_DAYS * DAY]:
+        del files[path]
+
+
+def growth(series, now, days):
+    """(bytes gained over the last days, size at the start).
+
+    A file first recorded inside the window is measured from that first
+    point, so a new file does not count its whole size as growth (its
+    arrival is memory-integrity's NEW alert).
+    """
+    current = latest(series)
+    if current is None:
+        return 0, 0
+    then = value_at(series, now - days * DAY)
+    if then is None:
+        then = points(series)[0][1]
+    return current[1] - then, then
+
+
+def _projection(series, now, limit, history_since):
+    """Days until series reaches limit at its recent rate, or None if not growing."""
+    if history_since is None or now - history_since < PROJECTION_DAYS * DAY:
+        return None
+    gained, _ = growth(series, now, PROJECTION_DAYS)
+    current = latest(series)[1]
+    if gained <= 0 or current >= limit:
+        return None
+    return (limit - current) / (gained / PROJECTION_DAYS)
+
+
+def alerts(history, now=None):
+    """Growth and projected-limit alerts from the history as of now."""
+    now = int(now or time.time())
+    since = history["since"]
+    result = []
+    if since is None or now - since < GROWTH_DAYS * DAY:
+        return result
+    total = history["total"]
+    gained, then = growth(total, now, GROWTH_DAYS)
+    if then and gained / then > TOTAL_GROWTH_ALERT:
+        top = top_growers(history, now, 3)
+        result.append(f"📈 GROWTH: total +{gained / 1024:.0f}KB in {GROWTH_DAYS} days "
+                      f"(+{gained / then:.0%})" + (f"; top: {', '.join(top)}" if top else ""))
+    for path, series in history["files"].items():
+        gained, _ = growth(series, now, GROWTH_DAYS)
+        if gained > FILE_GROWTH_ALERT:
+            result.append(f"📈 GROWTH: {path} +{gained / 1024:.0f}KB in {GROWTH_DAYS} days")
+
+    days = _projection(total, now, TOTAL_LIMIT, since)
+    if days is not None and days < PROJECTION_ALERT_DAYS:
+        result.append(f"⏳ PROJECTED: total reaches {TOTAL_LIMIT / 1000:.0f}KB in ~{days:.0f} days")
+    for path, series in history["files"].items():
+        days = _projection(series, now, FILE_LIMIT, since)
+        if days is not None and days < PROJECTION_ALERT_DAYS:
+            result.append(f"⏳ PROJECTED: {path} reaches {FILE_LIMIT / 1000:.0f}KB in ~{days:.0f} days")
+    return result
+
+
+def top_growers(history, now=None, n=5, days=GROWTH_DAYS):
+    """Paths with the largest byte growth over the last days."""
+    now = int(now or time.time())
+    gains = [(growth(series, now, days)[0], path) for path, series in history["files"].items()]
+    return [path for gained, path in sorted(gains, reverse=True)[:n] if gained > 0]
+
+
+def update(sizes, path=HISTORY_FILE, now=None):
+    """record() a run, save, and return its alerts."""
+    now = int(now or time.time())
+    history = load(path)
+    record(history, sizes, now)
+    save(history, path)
+    return alerts(history, now)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory size history and growth")
+    parser.add_argument("--file", help="Show this file's series instead of the total")
+    parser.add_argument("--days", type=int, default=GROWTH_DAYS, help="Growth window")
+    args = parser.parse_args()
+
+    history = load()
+    now = int(time.time())
+    series = history["files"].get(args.file, empty()) if args.file else history["total"]
+    for tier in ("weekly", "daily", "raw"):
+        for ts, size in series[tier]:
+            print(f"  {tier:6} {datetime.fromtimestamp(ts):%Y-%m-%d %H:%M} {size / 1024:8.1f} KB")
+    if not args.file:
+        print(f"\nTop growers over {args.days} days:")
+        for path in top_growers(history, now, days=args.days):
+            gained, _ = growth(history["files"][path], now, args.days)
+            print(f"  +{gained / 1024:.1f} KB  {path}")
+    for alert in alerts(history, now):
+        print(alert)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""memory_scores.py — read importance scores with recency applied at read time.
+
+score-memories stores each section's signal components (decision, people,
+money, action, routine, length) and the section's date, not a final score.
+The effective score is computed here when the file is read:
+
+  score = clamp(1, 10, BASELINE + sum(components) + recency(age in days))
+
+so a section's recency bonus fades on its own without rewriting the file.
+The recency curve is configurable through a "decay" object at the top of
+importance-scores.json:
+
+  {"curve": "step", "window": 3, "bonus": 1}          # +1 while < 3 days old (default)
+  {"curve": "linear", "window": 7, "bonus": 2}        # 2 → 0 over a week
+  {"curve": "exponential", "halfLife": 5, "bonus": 2}
+
+Records written before components existed keep their stored score.
+load() caches the computed scores per (file version, day).
+
+Usage:
+  python3 memory_scores.py                    # top 10 by effective score today
+  python3 memory_scores.py --top 20 --date 2026-03-10
+"""
+
+import argparse, json, os, sys
+from datetime import date, datetime
+from pathlib import Path
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+SCORES_FILE = WORKSPACE / "memory" / "importance-scores.json"
+BASELINE = 3
+DEFAULT_DECAY = {"curve": "step", "window": 3, "bonus": 1, "halfLife": 7}
+
+_cache = {}  # realpath -> (mtime_ns, size, day, scores)
+
+
+def recency(age_days, decay=DEFAULT_DECAY):
+    """Recency bonus for a section age_days old under the given curve."""
+    curve = decay.get("curve", "step")
+    bonus = decay.get("bonus", 1)
+    if age_days < 0:
+        age_days = 0
+    if curve == "step":
+        return bonus if age_days < decay.get("window", 3) else 0
+    if curve == "linear":
+        window = decay.get("window", 3) or 1
+        return bonus * max(0.0, 1 - age_days / window)
+    if curve == "exponential":
+        return bonus * 0.5 ** (age_days / (decay.get("halfLife", 7) or 1))
+    raise ValueError(f"unknown decay curve: {curve}")
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def combine(components, age_days, decay=DEFAULT_DECAY):
+    """Baseline + components + recency, clamped to 1-10."""
+    score = BASELINE + sum(components.values())
+    if age_days is not None:
+        score += recency(age_days, decay)
+    return round(max(1, min(10, score)), 2)
+
+
+def effective_score(record, today=None, decay=DEFAULT_DECAY):
+    """Score of one stored record on the given day."""
+    if "components" not in record:
+        return record.get("score", 0)  # frozen score from before components
+    today = _as_date(today or date.today())
+    age = (today - _as_date(record["date"])).days if record.get("date") else None
+    return combine(record["components"], age, decay)
+
+
+def read_decay(data):
+    return {**DEFAULT_DECAY, **data.get("decay", {})}
+
+
+def load(path=SCORES_FILE, today=None):
+    """{key: record + "score"} with effective scores for today.
+
+    Recomputed only when the file changes or the day rolls over.
+    """
+    day = _as_date(today or date.today())
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    key = os.path.realpath(path)
+    hit = _cache.get(key)
+    if hit and hit[:3] == (st.st_mtime_ns, st.st_size, day):
+        return hit[3]
+    data = json.loads(path.read_text(encoding="utf-8"))
+    decay = read_decay(data)
+    scores = {}
+    for name, record in data.get("scores", {}).items():
+        scores[name] = {**record, "score": effective_score(record, day, decay)}
+    _cache.clear()  # one file, one day at a time is all readers need
+    _cache[key] = (st.st_mtime_ns, st.st_size, day, scores)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Effective importance scores with recency decay")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--date", help="Score as of this day (YYYY-MM-DD)")
+    parser.add_argument("--file", default=str(SCORES_FILE))
+    args = parser.parse_args()
+
+    scores = load(args.file, args.date)
+    top = sorted(scores.items(), key=lambda kv: kv[1]["score"], reverse=True)[:args.top]
+    for key, record in top:
+        print(f"  [{record['score']:g}] {key} — {record.get('reason', '')}")
+    print(f"{len(scores)} sections")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""memory_search.py — SQLite FTS5 keyword search over the memory corpus.
+
+Indexes MEMORY.md, memory/*.md, memory/patterns and memory/archive at
+section granularity (H1-H3 chunks from memory_sections, with line ranges)
+and ranks hits with BM25. Updates are incremental: only files whose
+(mtime, size) changed are re-indexed. Also imported by mc-server.py for
+/api/memory/search.
+
+Usage:
+  python3 memory_search.py ollama routing          # search (index updated first)
+  python3 memory_search.py --limit 5 --json "qwen3"
+  python3 memory_search.py --raw 'title:mem0 OR body:qdrant'
+  python3 memory_search.py --update                # incremental update only
+  python3 memory_search.py --rebuild               # drop and re-index everything
+"""
+
+import argparse, json, os, re, sqlite3, sys, time
+from pathlib import Path
+
+import memory_sections
+
+WORKSPACE = Path("/Users/knut/.openclaw/workspace")
+DB_FILE = WORKSPACE / "memory-search.db"
+SOURCES = ["MEMORY.md", "memory/*.md", "memory/patterns/*.md", "memory/archive/*.md"]
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    path UNINDEXED, title, body, level UNINDEXED, start_line UNINDEXED, end_line UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+# bm25() takes one weight per column, unindexed ones included
+BM25_WEIGHTS = "0, 5.0, 1.0, 0, 0, 0"
+
+
+def source_files(workspace=WORKSPACE):
+    seen = {}
+    for pattern in SOURCES:
+        for path in sorted(workspace.glob(pattern)):
+            rel = str(path.relative_to(workspace))
+            seen.setdefault(rel, path)
+    return seen
+
+
+def connect(db_file=DB_FILE):
+    conn = sqlite3.connect(str(db_file), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def update(conn, workspace=WORKSPACE):
+    """Re-index files whose (mtime, size) changed; returns (changed, removed) counts."""
+    indexed = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT path, mtime_ns, size FROM files")}
+    current = source_files(workspace)
+    changed = removed = 0
+    with conn:
+        for rel, path in current.items():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if indexed.get(rel) == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                doc = memory_sections.load(path)
+            except (OSError, UnicodeDecodeError):
+                continue
+            # Flat H1-H3 chunks; text before the first heading is titled after the file
+            conn.execute("DELETE FROM sections WHERE path = ?", (rel,))
+            conn.executemany(
+                "INSERT INTO sections (path, title, body, level, start_line, end_line) VALUES (?, ?, ?, ?, ?, ?)",
+                [(rel, c.title or path.stem, c.body, c.level, c.line, c.end_line)
+                 for c in doc.chunks(1, 3, preamble=True)])
+            conn.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                         (rel, st.st_mtime_ns, st.st_size))
+            changed += 1
+        for rel in indexed:
+            if rel not in current:
+                conn.execute("DELETE FROM sections WHERE path = ?", (rel,))
+                conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+                removed += 1
+    return changed, removed
+
+
+def rebuild(conn, workspace=WORKSPACE):
+    with conn:
+        conn.execute("DELETE FROM sections")
+        conn.execute("DELETE FROM files")
+    return update(conn, workspace)
+
+
+def to_match(query):
+    """Turn free text into an FTS5 expression: all words required, last one as a prefix."""
+    words = TOKEN_RE.findall(query)
+    if not words:
+        return None
+    terms = ['"' + w.replace('"', '""') + '"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(conn, query, limit=10, raw=False, marks=("[", "]")):
+    """Return ranked section hits for a keyword query (best first)."""
+    match = query if raw else to_match(query)
+    if not match:
+        return []
+    rows = conn.execute(
+        f"""SELECT path, title, level, start_line, end_line,
+                   snippet(sections, 2, ?, ?, '…', 12), bm25(sections, {BM25_WEIGHTS}) AS rank
+            FROM sections WHERE sections MATCH ? ORDER BY rank LIMIT ?""",
+        (marks[0], marks[1], match, limit)).fetchall()
+    return [{
+        "path": path,
+        "title": title,
+        "level": level,
+        "startLine": start,
+        "endLine": end,
+        "snippet": snippet,
+        "score": round(-rank, 4),  # bm25() is lower-is-better; flip for readability
+    } for path, title, level, start, end, snippet, rank in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword search over memory files (SQLite FTS5)")
+    parser.add_argument("query", nargs="*", help="Search words")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 MATCH unchanged")
+    parser.add_argument("--update", action="store_true", help="Incremental update only")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every file")
+    args = parser.parse_args()
+
+    conn = connect()
+    start = time.time()
+    changed, removed = rebuild(conn) if args.rebuild else update(conn)
+    index_ms = (time.time() - start) * 1000
+
+    if not args.query:
+        total = conn.execute("SELECT count(*) FROM sections").fetchone()[0]
+        print(f"Index: {changed} file(s) re-indexed, {removed} removed, {total} sections ({index_ms:.0f}ms)")
+        return 0
+
+    q = " ".join(args.query)
+    start = time.time()
+    try:
+        hits = search(conn, q, limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Bad query: {e}", file=sys.stderr)
+        return 2
+    elapsed = (time.time() - start) * 1000
+
+    if args.json:
+        print(json.dumps({"query": q, "elapsed_ms": round(elapsed, 2), "hits": hits},
+                         indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"🔍 \"{q}\" → {len(hits)} results ({elapsed:.1f}ms)")
+    for h in hits:
+        print(f"  [{h['score']:.2f}] {h['path']}:{h['startLine']}-{h['endLine']} — {h['title']}")
+        print(f"         {h['snippet']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""memory_sections.py — shared markdown section parser for the memory scripts.
+
+Parses a file once into a tree of heading sections (level, title, line and
+byte ranges, body) in a single pass. load() caches the result per
+(path, mtime, size), so scripts running in one process — see
+memory-maintenance.py — read and parse each file exactly once.
+
+Used by score-memories, build-context-index, memory-contradictions, memory_entities,
+mem0-ingest, memory_search and build-memory-index.sh.
+"""
+
+import os, re
+from collections import Counter, namedtuple
+from pathlib import Path
+
+HEADING_RE = re.compile(r'^ {0,3}(#{1,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$')
+FENCE_RE = re.compile(r'^ {0,3}(```|~~~)')
+CACHE_MAX = 512
+CHARS_PER_TOKEN = 4  # rough average for BPE tokenizers on mixed English/Norwegian prose
+
+# A flat slice of a document between two headings of the chosen levels.
+# body excludes the heading line; text includes it. Both are stripped.
+Chunk = namedtuple("Chunk", "level title line end_line body text")
+
+_cache = {}       # realpath -> (mtime_ns, size, Document)
+stats = Counter() # "parses" / "hits" — for checking the one-parse-per-file goal
+
+
+class Section:
+    """One heading and everything under it.
+
+    line is the heading's line (1-based). end_line is the last line before
+    the next heading of the same or a higher level, so it covers
+    subsections. body_end_line is the last line before the next heading of
+    any level. start_byte/end_byte are UTF-8 offsets of the full range.
+    """
+
+    __slots__ = ("doc", "level", "title", "line", "end_line", "body_end_line",
+                 "parent", "children")
+
+    def __init__(self, doc, level, title, line, parent):
+        self.doc = doc
+        self.level = level
+        self.title = title
+        self.line = line
+        self.end_line = line
+        self.body_end_line = line
+        self.parent = parent
+        self.children = []
+
+    @property
+    def start_byte(self):
+        return self.doc.line_offsets[self.line - 1]
+
+    @property
+    def end_byte(self):
+        return self.doc.byte_offset(self.end_line)
+
+    @property
+    def body(self):
+        """Text under the heading up to the first subsection, stripped."""
+        first = self.line if self.level == 0 else self.line + 1
+        return "\n".join(self.doc.lines[first - 1:self.body_end_line]).strip()
+
+    @property
+    def full_text(self):
+        """Heading line plus everything up to end_line, subsections included."""
+        return "\n".join(self.doc.lines[self.line - 1:self.end_line])
+
+    def __repr__(self):
+        return f"Section(h{self.level} {self.title!r} {self.line}-{self.end_line})"
+
+
+class Document:
+    """Parsed markdown file: root section (level 0) plus a flat list in file order."""
+
+    def __init__(self, text, path=None):
+        self.path = path
+        self.text = text
+        self.lines = text.split("\n")
+        self.line_offsets = []
+        self.root = Section(self, 0, "", 1, None)
+        self.sections = []
+        self._parse()
+
+    def _parse(self):
+        stack = [self.root]
+        current = self.root  # section whose body is being read
+        offset = 0
+        in_fence = False
+        for i, line in enumerate(self.lines, 1):
+            self.line_offsets.append(offset)
+            offset += len(line.encode("utf-8")) + 1
+            if FENCE_RE.match(line):
+                in_fence = not in_fence
+                continue
+            if in_fence or "#" not in line[:4]:
+                continue
+            m = HEADING_RE.match(line)
+            if not m:
+                continue
+            level = len(m.group(1))
+            current.body_end_line = i - 1
+            while stack[-1].level >= level:
+                stack.pop().end_line = i - 1
+            section = Section(self, level, m.group(2).strip(), i, stack[-1])
+            stack[-1].children.append(section)
+            stack.append(section)
+            self.sections.append(section)
+            current = section
+        n = len(self.lines)
+        current.body_end_line = n
+        for section in stack:
+            section.end_line = n
+        self.size = offset - 1 if self.lines else 0
+
+    def byte_offset(self, end_line):
+        """UTF-8 offset just past end_line (exclusive end of a range)."""
+        if end_line >= len(self.lines):
+            return self.size
+        return self.line_offsets[end_line]
+
+    def headings(self, *levels):
+        return [s for s in self.sections if not levels or s.level in levels]
+
+    def chunks(self, min_level=1, max_level=3, preamble=False):
+        """Split at headings with min_level <= level <= max_level into flat chunks.
+
+        Headings outside the range stay inside the surrounding chunk. With
+        preamble=True, text before the first split heading becomes a
+        level-0 chunk with an empty title.
+        """
+        splits = [s for s in self.sections if min_level <= s.level <= max_level]
+        result = []
+        if preamble:
+            end = splits[0].line - 1 if splits else len(self.lines)
+            text = "\n".join(self.lines[:end]).strip()
+            if text:
+                result.append(Chunk(0, "", 1, end, text, text))
+        for k, s in enumerate(splits):
+            end = splits[k + 1].line - 1 if k + 1 < len(splits) else len(self.lines)
+            body = "\n".join(self.lines[s.line:end]).strip()
+            text = "\n".join(self.lines[s.line - 1:end]).strip()
+            result.append(Chunk(s.level, s.title, s.line, end, body, text))
+        return result
+
+
+def estimate_tokens(text):
+    """Approximate LLM token count of text (no tokenizer dependency)."""
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def parse(text, path=None):
+    return Document(text, path)
+
+
+def load(path):
+    """Parse a file, reusing the cached tree while (mtime, size) are unchanged."""
+    path = Path(path)
+    st = path.stat()
+    key = os.path.realpath(path)
+    hit = _cache.get(key)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        stats["hits"] += 1
+        return hit[2]
+    doc = Document(path.read_text(encoding="utf-8"), path)
+    stats["parses"] += 1
+    if len(_cache) >= CACHE_MAX:
+        _cache.clear()
+    _cache[key] = (st.st_mtime_ns, st.st_size, doc)
+    return doc
@@ -8,40 +8,77 @@ Scores each H2/H3 section 1-10 based on signals:
 - Contains action items/todos → +1
 - Is a routine log entry → -2
 - Section length (longer = more substantial) → +1 if >200 chars
-- Recency bonus → +1 if < 3 days old
+- Recency bonus → +1 if < 3 days old (default curve)
+
+The scores file stores each section's signal components and date, not a
+final score; memory_scores applies the baseline and the recency curve at
+read time, so scores age without a rescore.
+
+All keyword signals and entity mentions are one combined regex, run once
+over a whole batch of sections joined together; each match is mapped back
+to its section with a binary search over the batch offsets.
+
+Usage:
+  python3 score-memories.py              # score new sections from the last 14 days
+  python3 score-memories.py --full       # rescore all daily logs, archive included
+  python3 score-memories.py --benchmark  # time scoring on 100k synthetic sections
 """
 
-import json, os, re
+import argparse, bisect, json, os, random, re, sys, time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import memory_entities
+import memory_scores
+import memory_sections
+
 MEMORY_DIR = Path("/Users/knut/.openclaw/workspace/memory")
+ARCHIVE_DIR = MEMORY_DIR / "archive"
 SCORES_FILE = MEMORY_DIR / "importance-scores.json"
 DAYS = 14
+BATCH_SIZE = 2000
+BATCH_SEP = "\n\x00\n"  # no word characters, so no match spans two sections
+
+DECISION_TERMS = ("decided", "decision", "chose", "switched", "migrated", "launched",
+                  "deployed", "fixed", "lesson", "learned", "mistake", "insight",
+                  "important", "critical", "breakthrough",
+                  "bestemt", "valgte", "lærte", "viktig")
+ACTION_TERMS = ("TODO", "FIXME", "action item", "need to", "must", "should",
+                "blocked", "waiting")
+ROUTINE_TERMS = ("heartbeat", "HEARTBEAT_OK", "routine check", "no new", "nothing")
+# People and money mentions come from memory_entities (people.md,
+# projects.md, the investments watchlist).
+
+DECISION_WORDS = re.compile(r'\b(?:' + "|".join(DECISION_TERMS) + r')\b', re.I)
+
+# Signal bits, and (bit, component, points, reason) in reason order
+DECISION, PEOPLE, MONEY, ACTION, ROUTINE = 1, 2, 4, 8, 16
+SIGNALS = [
+    (DECISION, "decision", 3, "decision/lesson"),
+    (PEOPLE, "people", 2, "mentions people"),
+    (MONEY, "money", 2, "financial"),
+    (ACTION, "action", 1, "action items"),
+    (ROUTINE, "routine", -2, "routine"),
+]
+KEYWORD_BITS = {}
+for _bit, _terms in ((DECISION, DECISION_TERMS), (ACTION, ACTION_TERMS), (ROUTINE, ROUTINE_TERMS)):
+    for _term in _terms:
+        KEYWORD_BITS[_term.lower()] = KEYWORD_BITS.get(_term.lower(), 0) | _bit
 
-DECISION_WORDS = re.compile(
-    r'\b(decided|decision|chose|switched|migrated|launched|deployed|fixed|'
-    r'lesson|learned|mistake|insight|important|critical|breakthrough|'
-    r'bestemt|valgte|lærte|viktig)\b', re.I)
-PEOPLE_WORDS = re.compile(
-    r'\b(Knut|Melissa|Martin|Andre|Dag|Eloise)\b')
-MONEY_WORDS = re.compile(
-    r'\b(invest|stock|portfolio|MACD|crossover|aksje|PE \d|ROE|'
-    r'price|earnings|dividend|SAMPO|NOVO|PROT|BRAV|COOR|SECU|'
-    r'BTC|ETH|crypto|USD|NOK|EUR)\b', re.I)
-ACTION_WORDS = re.compile(
-    r'\b(TODO|FIXME|action item|need to|must|should|blocked|waiting)\b', re.I)
-ROUTINE_WORDS = re.compile(
-    r'\b(heartbeat|HEARTBEAT_OK|routine check|no new|nothing)\b', re.I)
-
-
-def find_files():
+_signal_regex = {}  # id(entities) -> (entities, compiled regex)
+
+
+def find_files(full=False):
+    """Daily logs from the last DAYS days, or every daily log (archive too) with full."""
     cutoff = datetime.now() - timedelta(days=DAYS)
+    candidates = list(MEMORY_DIR.glob("2???-??-??*.md"))
+    if full:
+        candidates += ARCHIVE_DIR.glob("2???-??-??*.md")
     files = []
-    for f in sorted(MEMORY_DIR.glob("2???-??-??*.md")):
+    for f in sorted(candidates, key=lambda f: (f.name, str(f))):
         try:
             d = datetime.strptime(f.name[:10], "%Y-%m-%d")
-            if d >= cutoff:
+            if full or d >= cutoff:
                 files.append(f)
         except ValueError:
             continue
@@ -49,75 +86,145 @@ def find_files():
 
 
 def extract_sections(path):
-    text = path.read_text(encoding="utf-8")
+    """H2/H3 sections as (title, content), via the shared cached parser."""
+    doc = memory_sections.load(path)
+    return [(c.title, c.body) for c in doc.chunks(2, 3) if c.body]
+
+
+def signal_regex(entities):
+    """Every keyword and entity name as one trie-shaped regex over lower-cased text.
+
+    Matching pre-lowered text without re.I is almost twice as fast.
+    """
+    hit = _signal_regex.get(id(entities))
+    if hit and hit[0] is entities:
+        return hit[1]
+    names = set(KEYWORD_BITS) | set(entities.names())
+    regex = re.compile(r'\b(?:' + memory_entities.trie_regex(names) + r')(?!\w)')
+    _signal_regex[id(entities)] = (entities, regex)
+    return regex
+
+
+def section_signals(contents, entities):
+    """Signal bitmask per content string, from one regex pass over the batch."""
+    regex = signal_regex(entities)
+    starts = []
+    pos = 0
+    for content in contents:
+        starts.append(pos)
+        pos += len(content) + len(BATCH_SEP)
+    masks = [0] * len(contents)
+    text = BATCH_SEP.join(contents)
+    lowered = text.lower()
+    if len(lowered) != len(text):  # e.g. "İ" lower-cases to two characters
+        lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    found_bits = {}  # matched text -> bits; the same words repeat a lot
+    for m in regex.finditer(lowered):
+        found = text[m.start():m.end()]  # original case, for case-sensitive names
+        bits = found_bits.get(found)
+        if bits is None:
+            kinds = {e.kind for e in entities.lookup(found)}
+            bits = (KEYWORD_BITS.get(found.lower(), 0) |
+                    (PEOPLE if "person" in kinds else 0) |
+                    (MONEY if kinds & memory_entities.MONEY_KINDS else 0))
+            found_bits[found] = bits
+        if bits:
+            masks[bisect.bisect_right(starts, m.start()) - 1] |= bits
+    return masks
+
+
+def score_components(sections, entities=None):
+    """(title, content) pairs -> [(components, reason), ...], without recency."""
+    entities = entities or memory_entities.load(MEMORY_DIR.parent)
+    results = []
+    for i in range(0, len(sections), BATCH_SIZE):
+        batch = sections[i:i + BATCH_SIZE]
+        masks = section_signals([content for _, content in batch], entities)
+        for (title, content), mask in zip(batch, masks):
+            if not mask & DECISION and DECISION_WORDS.search(title):
+                mask |= DECISION
+            components = {}
+            reasons = []
+            for bit, name, points, reason in SIGNALS:
+                if mask & bit:
+                    components[name] = points
+                    reasons.append(reason)
+            if len(content) > 200:
+                components["length"] = 1
+            results.append((components, ", ".join(reasons) or "general"))
+    return results
+
+
+def score_batch(sections, entities=None, now=None):
+    """Score (title, content, file_date) tuples; returns [(score, reason), ...]."""
+    now = now or datetime.now()
+    components = score_components([(title, content) for title, content, _ in sections], entities)
+    return [(memory_scores.combine(comp, (now - file_date).days), reason)
+            for (comp, reason), (_, _, file_date) in zip(components, sections)]
+
+
+def score_section(title, content, file_date, entities=None):
+    return score_batch([(title, content, file_date)], entities)[0]
+
+
+def synthetic_sections(n, seed=1):
+    """n (title, content, file_date) tuples shaped like daily-log sections."""
+    rng = random.Random(seed)
+    filler = ("checked the cron output and the index looks fine after the "
+              "sync ran again with the usual settings").split()
+    signal_words = ["decided", "lesson", "Knut", "Melissa", "SAMPO", "portfolio",
+                    "TODO", "blocked", "heartbeat", "nothing", "NOK", "Mission Control"]
+    today = datetime.now()
     sections = []
-    current_title = None
-    current_lines = []
-
-    for line in text.split("\n"):
-        m = re.match(r'^(#{2,3})\s+(.+)$', line)
-        if m:
-            if current_title and current_lines:
-                content = "\n".join(current_lines).strip()
-                if content:
-                    sections.append((current_title, content))
-            current_title = m.group(2).strip()
-            current_lines = []
-        elif current_title is not None:
-            current_lines.append(line)
-
-    if current_title and current_lines:
-        content = "\n".join(current_lines).strip()
-        if content:
-            sections.append((current_title, content))
+    for i in range(n):
+        words = rng.choices(filler, k=rng.randint(10, 80))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(signal_words))
+        sections.append((f"Section {i}", "- " + " ".join(words),
+                         today - timedelta(days=rng.randint(0, 60))))
     return sections
 
 
-def score_section(title, content, file_date):
-    score = 3  # baseline
-
-    if DECISION_WORDS.search(content) or DECISION_WORDS.search(title):
-        score += 3
-    if PEOPLE_WORDS.search(content):
-        score += 2
-    if MONEY_WORDS.search(content):
-        score += 2
-    if ACTION_WORDS.search(content):
-        score += 1
-    if ROUTINE_WORDS.search(content):
-        score -= 2
-    if len(content) > 200:
-        score += 1
-    if (datetime.now() - file_date).days < 3:
-        score += 1
-
-    # Build reason
-    reasons = []
-    if DECISION_WORDS.search(content) or DECISION_WORDS.search(title):
-        reasons.append("decision/lesson")
-    if PEOPLE_WORDS.search(content):
-        reasons.append("mentions people")
-    if MONEY_WORDS.search(content):
-        reasons.append("financial")
-    if ACTION_WORDS.search(content):
-        reasons.append("action items")
-    if ROUTINE_WORDS.search(content):
-        reasons.append("routine")
-
-    return max(1, min(10, score)), ", ".join(reasons) or "general"
-
-
-def main():
-    files = find_files()
-    print(f"Found {len(files)} memory files (last {DAYS} days)")
-
-    existing = {}
+def benchmark(n=100_000):
+    entities = memory_entities.load(MEMORY_DIR.parent)
+    sections = synthetic_sections(n)
+    chars = sum(len(c) for _, c, _ in sections)
+    start = time.perf_counter()
+    results = score_batch(sections, entities)
+    elapsed = time.perf_counter() - start
+    avg = sum(score for score, _ in results) / len(results)
+    print(f"{n} sections, {chars / 1e6:.1f}M chars: {elapsed * 1000:.0f}ms "
+          f"({n / elapsed:,.0f} sections/s), avg score {avg:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heuristic importance scoring for memory sections")
+    parser.add_argument("--full", action="store_true",
+                        help="Rescore every daily log, archive included (backfill)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time scoring on a synthetic 100k-section corpus")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    files = find_files(full=args.full)
+    if args.full:
+        print(f"Found {len(files)} memory files (full history, archive included)")
+    else:
+        print(f"Found {len(files)} memory files (last {DAYS} days)")
+
+    data = {}
     if SCORES_FILE.exists():
-        existing = json.loads(SCORES_FILE.read_text()).get("scores", {})
+        data = json.loads(SCORES_FILE.read_text())
+    existing = data.get("scores", {})
 
     new_count = 0
     all_scores = dict(existing)
+    entities = memory_entities.load(MEMORY_DIR.parent)
 
+    pending = []  # (key, title, content, file_date)
     for f in files:
         try:
             file_date = datetime.strptime(f.name[:10], "%Y-%m-%d")
@@ -126,32 +233,44 @@ def main():
         sections = extract_sections(f)
         for title, content in sections:
             key = f"{f.name}#{title}"
-            if key in all_scores:
+            # Entries from before components were stored get upgraded too
+            if "components" in all_scores.get(key, {}) and not args.full:
                 continue
-            score, reason = score_section(title, content, file_date)
-            all_scores[key] = {
-                "score": score,
-                "reason": reason,
-                "scoredAt": datetime.now().isoformat(),
-                "accessCount": 0,
-                "lastAccessed": None
-            }
+            pending.append((key, title, content, file_date))
+
+    start = time.time()
+    results = score_components([(t, c) for _, t, c, _ in pending], entities)
+    scored_at = datetime.now().isoformat()
+    for (key, _, _, file_date), (components, reason) in zip(pending, results):
+        # A rescore keeps access stats from the previous entry
+        prev = all_scores.get(key, {})
+        all_scores[key] = {
+            "components": components,
+            "date": file_date.strftime("%Y-%m-%d"),
+            "reason": reason,
+            "scoredAt": scored_at,
+            "accessCount": prev.get("accessCount", 0),
+            "lastAccessed": prev.get("lastAccessed")
+        }
+        if not prev:
             new_count += 1
+    print(f"Scored {len(pending)} sections in {(time.time() - start) * 1000:.0f}ms")
 
-    # Save
-    data = {"scores": all_scores, "updatedAt": datetime.now().isoformat()}
+    # Save (a hand-set "decay" curve is kept)
+    data = {**data, "scores": all_scores, "updatedAt": datetime.now().isoformat()}
     SCORES_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False))
 
-    # Summary
-    vals = [v["score"] for v in all_scores.values()]
+    # Summary, with today's effective scores
+    effective = memory_scores.load(SCORES_FILE)
+    vals = [v["score"] for v in effective.values()]
     avg = sum(vals) / len(vals) if vals else 0
-    top5 = sorted(all_scores.items(), key=lambda x: x[1]["score"], reverse=True)[:5]
+    top5 = sorted(effective.items(), key=lambda x: x[1]["score"], reverse=True)[:5]
 
     print(f"New: {new_count} | Total: {len(all_scores)} | Avg: {avg:.1f}")
     print("\nTop 5:")
     for key, v in top5:
-        print(f"  [{v['score']}] {key} — {v['reason']}")
+        print(f"  [{v['score']:g}] {key} — {v['reason']}")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
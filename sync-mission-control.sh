@@ -7,5 +7,6 @@ cp "$SRC/taskboard.html" "$DST/mission-control.html"
 cp "$SRC/tasks.json" "$DST/tasks.json"
 cp "$SRC/investments.json" "$DST/investments.json" 2>/dev/null
 cp "$SRC/memory-index.json" "$DST/memory-index.json" 2>/dev/null
+rm -rf "$DST/memory-shards" && cp -R "$SRC/memory-shards" "$DST/memory-shards" 2>/dev/null
 cp "$SRC/schedule.json" "$DST/schedule.json" 2>/dev/null
 echo "Mission Control synced"